@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'spectrum.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(400, 360)
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(Dialog)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.groupBox = QtWidgets.QGroupBox(Dialog)
+        self.groupBox.setObjectName("groupBox")
+        self.horizontalLayout = QtWidgets.QHBoxLayout(self.groupBox)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.verticalLayout = QtWidgets.QVBoxLayout()
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.radioButton = QtWidgets.QRadioButton(self.groupBox)
+        self.radioButton.setChecked(True)
+        self.radioButton.setObjectName("radioButton")
+        self.verticalLayout.addWidget(self.radioButton)
+        self.radioButton_2 = QtWidgets.QRadioButton(self.groupBox)
+        self.radioButton_2.setObjectName("radioButton_2")
+        self.verticalLayout.addWidget(self.radioButton_2)
+        self.checkBox = QtWidgets.QCheckBox(self.groupBox)
+        self.checkBox.setObjectName("checkBox")
+        self.verticalLayout.addWidget(self.checkBox)
+        self.horizontalLayout.addLayout(self.verticalLayout)
+        self.verticalLayout_2.addWidget(self.groupBox)
+        self.groupBox_2 = QtWidgets.QGroupBox(Dialog)
+        self.groupBox_2.setEnabled(False)
+        self.groupBox_2.setObjectName("groupBox_2")
+        self.formLayout = QtWidgets.QFormLayout(self.groupBox_2)
+        self.formLayout.setObjectName("formLayout")
+        self.label = QtWidgets.QLabel(self.groupBox_2)
+        self.label.setObjectName("label")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.label)
+        self.comboBox = QtWidgets.QComboBox(self.groupBox_2)
+        self.comboBox.setObjectName("comboBox")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.comboBox.addItem("")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.comboBox)
+        self.label_2 = QtWidgets.QLabel(self.groupBox_2)
+        self.label_2.setObjectName("label_2")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.label_2)
+        self.spinBox = QtWidgets.QSpinBox(self.groupBox_2)
+        self.spinBox.setMaximum(90)
+        self.spinBox.setSingleStep(5)
+        self.spinBox.setProperty("value", 50)
+        self.spinBox.setObjectName("spinBox")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.spinBox)
+        self.label_3 = QtWidgets.QLabel(self.groupBox_2)
+        self.label_3.setObjectName("label_3")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.label_3)
+        self.comboBox_2 = QtWidgets.QComboBox(self.groupBox_2)
+        self.comboBox_2.setObjectName("comboBox_2")
+        self.comboBox_2.addItem("")
+        self.comboBox_2.addItem("")
+        self.comboBox_2.addItem("")
+        self.comboBox_2.addItem("")
+        self.formLayout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.comboBox_2)
+        self.verticalLayout_2.addWidget(self.groupBox_2)
+        self.groupBox_3 = QtWidgets.QGroupBox(Dialog)
+        self.groupBox_3.setObjectName("groupBox_3")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout(self.groupBox_3)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.checkBox_2 = QtWidgets.QCheckBox(self.groupBox_3)
+        self.checkBox_2.setObjectName("checkBox_2")
+        self.verticalLayout_3.addWidget(self.checkBox_2)
+        self.verticalLayout_2.addWidget(self.groupBox_3)
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.horizontalLayout_2.addWidget(self.buttonBox)
+        self.verticalLayout_2.addLayout(self.horizontalLayout_2)
+        self.horizontalLayout_3.addLayout(self.verticalLayout_2)
+
+        self.retranslateUi(Dialog)
+        self.comboBox.setCurrentIndex(4)
+        self.buttonBox.rejected.connect(Dialog.close) # type: ignore
+        self.buttonBox.accepted.connect(Dialog.hide) # type: ignore
+        self.radioButton_2.toggled['bool'].connect(self.groupBox_2.setEnabled) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "频谱设置"))
+        self.groupBox.setTitle(_translate("Dialog", "频谱计算方式"))
+        self.radioButton.setText(_translate("Dialog", "单次 FFT"))
+        self.radioButton_2.setText(_translate("Dialog", "Welch 平均"))
+        self.checkBox.setText(_translate("Dialog", "单次 FFT 补零到快速变换长度"))
+        self.groupBox_2.setTitle(_translate("Dialog", "Welch 参数"))
+        self.label.setText(_translate("Dialog", "分段长度"))
+        self.comboBox.setItemText(0, _translate("Dialog", "256"))
+        self.comboBox.setItemText(1, _translate("Dialog", "512"))
+        self.comboBox.setItemText(2, _translate("Dialog", "1024"))
+        self.comboBox.setItemText(3, _translate("Dialog", "2048"))
+        self.comboBox.setItemText(4, _translate("Dialog", "4096"))
+        self.comboBox.setItemText(5, _translate("Dialog", "8192"))
+        self.comboBox.setItemText(6, _translate("Dialog", "16384"))
+        self.comboBox.setItemText(7, _translate("Dialog", "32768"))
+        self.comboBox.setItemText(8, _translate("Dialog", "65536"))
+        self.label_2.setText(_translate("Dialog", "重叠 (%)"))
+        self.label_3.setText(_translate("Dialog", "窗函数"))
+        self.comboBox_2.setItemText(0, _translate("Dialog", "hann"))
+        self.comboBox_2.setItemText(1, _translate("Dialog", "hamming"))
+        self.comboBox_2.setItemText(2, _translate("Dialog", "blackman"))
+        self.comboBox_2.setItemText(3, _translate("Dialog", "boxcar"))
+        self.groupBox_3.setTitle(_translate("Dialog", "频率测量"))
+        self.checkBox_2.setText(_translate("Dialog", "由频谱峰值估计频率（否则由过零次数估计）"))
+
+
+if __name__ == "__main__":
+    import sys
+    app = QtWidgets.QApplication(sys.argv)
+    Dialog = QtWidgets.QDialog()
+    ui = Ui_Dialog()
+    ui.setupUi(Dialog)
+    Dialog.show()
+    sys.exit(app.exec_())
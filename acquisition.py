@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing Acquisition.
+"""
+
+import numpy as np
+
+import sample_file
+
+# 序列化为文本时每次格式化的行数。
+TEXT_CHUNK_ROWS = 1 << 16
+
+
+class Acquisition(object):
+    """
+    一次采集（或从文件恢复）的数据。
+
+    采样数据以数组形式保存，只有在导出或查看时才按需序列化，并且分块写到
+    目标中，不会在内存中拼出完整的文本。
+
+    第 k 个采样点的时间为 t0 + k * dt，不保存时间轴数组，需要时由 time
+    计算。
+    """
+    def __init__(self, y, f_s, t0=0.0, v_range=(0.0, 0.0), spectrum=None):
+        """
+        Constructor
+
+        @param y 采样值（V）
+        @type numpy.ndarray
+        @param f_s 采样频率（Hz）
+        @type float
+        @param t0 第一个采样点的时间（s）
+        @type float
+        @param v_range 采集时的输入电压范围 (下限, 上限)
+        @type tuple of float
+        @param spectrum 生成数据时已经得到的单次 FFT 幅度谱 (频率, 幅值)
+        @type tuple of numpy.ndarray
+        """
+        self.y = y
+        self.N = len(y)
+        self.f_s = f_s
+        self.t0 = t0
+        self.v_range = v_range
+        self.spectrum = spectrum
+
+    @property
+    def dt(self):
+        """采样间隔（s）。"""
+        return 1.0 / self.f_s
+
+    def time(self, start=0, stop=None):
+        """
+        计算第 start ~ stop - 1 个采样点的时间。
+
+        @param start 第一个点的序号
+        @type int
+        @param stop 最后一个点的序号加 1，默认到最后一个点
+        @type int
+        @return 采样时间（s）
+        @rtype numpy.ndarray
+        """
+        stop = self.N if stop is None else min(stop, self.N)
+        return self.t0 + np.arange(start, stop) / self.f_s
+
+    def iter_text(self, chunk_rows=TEXT_CHUNK_ROWS):
+        """
+        逐块生成文本格式的数据：前两行为 N 与 f_s，其后每行一个 (x, y)。
+
+        @param chunk_rows 每块包含的行数
+        @type int
+        @return 文本块生成器
+        @rtype generator of str
+        """
+        yield f"{self.N}\n{self.f_s}"
+        for start in range(0, self.N, chunk_rows):
+            x = self.time(start, start + chunk_rows).tolist()
+            y = self.y[start:start + chunk_rows].tolist()
+            yield "\n" + "\n".join([f"({a!r}, {b!r})" for a, b in zip(x, y)])
+
+    def write_text(self, file, progress=None):
+        """
+        将数据以文本格式分块写入已打开的文件。
+
+        @param file 以文本模式打开的文件对象
+        @type io.TextIOBase
+        @param progress 每写完一块后的回调，参数为 (已写行数, N)
+        @type callable
+        """
+        # 第一块是文件头，其后每块 TEXT_CHUNK_ROWS 行。
+        rows = 0
+        for text in self.iter_text():
+            file.write(text)
+            if progress:
+                progress(min(rows, self.N), self.N)
+            rows += TEXT_CHUNK_ROWS
+
+    def write_binary(self, file_name, progress=None):
+        """
+        将数据写入二进制采样文件。
+
+        @param file_name 文件路径
+        @type str
+        @param progress 每写完一块后的回调，参数为 (已写点数, N)
+        @type callable
+        """
+        sample_file.write_sample_file(file_name, self.y, self.f_s, self.t0,
+                                      self.v_range, progress)
+
+
+def load_file(file_name, progress=None, dtype=np.float64):
+    """
+    从导出的文件中恢复数据，二进制与文本格式都可以。不依赖 Qt，可在后台
+    线程或子进程中调用。
+
+    @param file_name 数据文件路径
+    @type str
+    @param progress 读取文本文件时的进度回调，参数为 (已读行数, N)
+    @type callable
+    @param dtype 文本文件中采样值的数据类型；二进制文件保持文件中的类型
+    @type numpy.dtype
+    @return 文件中的数据
+    @rtype Acquisition
+    @exception sample_file.SampleFileError 文件格式错误
+    """
+    if sample_file.is_sample_file(file_name):
+        # 二进制采样文件以内存映射方式打开。
+        header, y = sample_file.read_sample_file(file_name)
+        return Acquisition(y, header.f_s, header.t0,
+                           (header.v_min, header.v_max))
+
+    # 文本文件分块解析。
+    y, N, f_s, t0 = sample_file.read_text_file(file_name, progress=progress,
+                                               dtype=dtype)
+    return Acquisition(y, f_s, t0)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing the analysis of an acquisition.
+
+频谱与测量的计算不依赖 Qt：界面的后台线程 ComputeThread 与命令行批处理
+batch.py 都调用 analyze。
+"""
+
+import numpy as np
+
+import measurement
+import spectrum
+from instrument import NULL_TRACE
+
+# 汇总表中列出的频谱峰值个数。
+PEAK_COUNT = 3
+
+
+class Analysis(object):
+    """一次采集的频谱与测量结果。"""
+    def __init__(self, xf, yf, features):
+        """
+        Constructor
+
+        @param xf 频谱的频率
+        @type numpy.ndarray
+        @param yf 频谱的幅值
+        @type numpy.ndarray
+        @param features 最大幅值、周期与频率
+        @type tuple of float
+        """
+        self.xf = xf
+        self.yf = yf
+        self.features = features
+
+
+def acquisition_spectrum(acquisition, settings=None):
+    """
+    按设置计算采集数据的频谱；合成数据时已经得到的单次 FFT 直接使用。
+
+    @param acquisition 采样数据
+    @type Acquisition
+    @param settings 频谱设置，默认为单次 FFT
+    @type spectrum.SpectrumSettings
+    @return 频率与对应的幅值
+    @rtype tuple of (numpy.ndarray, numpy.ndarray)
+    """
+    settings = settings or spectrum.SpectrumSettings()
+    if (acquisition.spectrum is not None
+            and settings.mode == spectrum.SINGLE
+            and not settings.fast_len):
+        return acquisition.spectrum
+    return spectrum.compute_spectrum(acquisition.y, acquisition.f_s, settings)
+
+
+def analyze(acquisition, settings=None, progress=None, trace=NULL_TRACE,
+            precomputed=None):
+    """
+    计算采集数据的频谱，并测量最大幅值、周期与频率。
+
+    @param acquisition 采样数据
+    @type Acquisition
+    @param settings 频谱设置，默认为单次 FFT
+    @type spectrum.SpectrumSettings
+    @param progress 各阶段开始时的回调，参数为 (进度, 阶段说明)，进度范围
+        40~70，与 ComputeThread 的进度条一致
+    @type callable
+    @param trace 记录 FFT 与测量两个阶段的耗时与内存，见 instrument 模块
+    @type instrument.Trace
+    @param precomputed 已经得到的频谱 (频率, 幅值)，如多次平均的幅度谱；
+        为 None 时按 settings 计算
+    @type tuple of numpy.ndarray
+    @return 频谱与测量结果
+    @rtype Analysis
+    """
+    settings = settings or spectrum.SpectrumSettings()
+    y = acquisition.y
+
+    if progress:
+        progress(40, "FFT")
+    with trace.stage("FFT", acquisition.N):
+        if precomputed is not None:
+            xf, yf = precomputed
+        else:
+            xf, yf = acquisition_spectrum(acquisition, settings)
+
+    if progress:
+        progress(70, "测量")
+    with trace.stage("测量", acquisition.N):
+        features = measurement.measure(y, acquisition.N / acquisition.f_s)
+        if settings.peak_frequency:
+            frequency = measurement.spectral_peak(xf, yf,
+                                                  settings.spectrum_window)
+            period = 1 / frequency if frequency else float("inf")
+            features = (features[0], period, frequency)
+    return Analysis(xf, yf, features)
+
+
+def dominant_peaks(xf, yf, count=PEAK_COUNT, window="boxcar"):
+    """
+    找出频谱中幅值最大的 count 个局部峰值（不含直流频点），频率经过频点间
+    插值。
+
+    @param xf 频率，等间隔
+    @type numpy.ndarray
+    @param yf 幅值
+    @type numpy.ndarray
+    @param count 峰值个数
+    @type int
+    @param window 计算频谱时使用的窗函数名称
+    @type str
+    @return 按幅值从大到小排列的 (频率, 幅值)
+    @rtype list of tuple of float
+    """
+    # SciPy 在第一次用到时才导入，见 spectrum 模块。
+    from scipy.signal import find_peaks
+
+    peaks, _ = find_peaks(yf[1:])
+    peaks += 1
+    peaks = peaks[np.argsort(yf[peaks])[::-1][:count]]
+    return [(measurement.interpolate_peak(xf, yf, k, window), float(yf[k]))
+            for k in peaks]
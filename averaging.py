@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing the ensemble averaging of repeated acquisitions.
+
+合成数据每次都加上新的噪声，而信号与采样时钟同步（相位每次相同），把多次
+采集的采样值逐点平均即可压低噪声，幅度谱的平均则使噪声基底更平滑。
+
+    LINEAR       K 次等权平均，每次开始新的平均
+    EXPONENTIAL  权重为 max(1/n, 1/K) 的指数平均，跨多次开始持续累加
+    PEAK_HOLD    幅度谱逐频点取最大值，采样波形为最近一次采集
+
+采样值与幅度谱各有一个预先分配的累加数组，更新全部原地进行：新采集的数组
+先减去累加值得到偏差，乘以权重后加回累加数组，不产生与记录等长的临时数组。
+内存与平均次数无关，参数不变时重复开始也复用同一组数组。
+
+信噪比的估计：累加值的信号部分与单次采集相同，新采集与累加值之差只含噪声，
+其方差为 σ² (1 + g)，g 为各次权重的平方和，即平均后噪声功率与单次的比值。
+由此逐次估计单次采集的噪声方差 σ²，平均后的信噪比为
+(累加值的方差 - g σ²) / (g σ²)，信噪比的提高为 1/g。
+"""
+
+import threading
+import time
+
+import numpy as np
+
+LINEAR = "linear"
+EXPONENTIAL = "exponential"
+PEAK_HOLD = "peak hold"
+
+# 各平均方式在菜单与状态栏中的名称。
+MODE_NAMES = {
+    LINEAR: "线性平均",
+    EXPONENTIAL: "指数平均",
+    PEAK_HOLD: "峰值保持",
+}
+
+# 默认的平均次数。
+DEFAULT_COUNT = 16
+
+
+class AverageStats(object):
+    """一次平均结束时的统计。"""
+    def __init__(self, mode, averages, count, snr, improvement, seconds,
+                 accumulate_seconds):
+        """
+        Constructor
+
+        @param mode 平均方式
+        @type str
+        @param averages 累加数组中已平均的采集次数
+        @type int
+        @param count 平均次数 K
+        @type int
+        @param snr 平均后采样波形的信噪比（dB），无法估计时为 None
+        @type float
+        @param improvement 信噪比的提高（dB）
+        @type float
+        @param seconds 每次平均的耗时（s），含生成数据与频谱
+        @type float
+        @param accumulate_seconds 每次平均中原地累加的耗时（s）
+        @type float
+        """
+        self.mode = mode
+        self.averages = averages
+        self.count = count
+        self.snr = snr
+        self.improvement = improvement
+        self.seconds = seconds
+        self.accumulate_seconds = accumulate_seconds
+
+    def summary(self):
+        """
+        状态栏中显示的摘要。
+
+        @return 摘要
+        @rtype str
+        """
+        parts = [f"{MODE_NAMES[self.mode]} {self.averages} 次（K={self.count}）"]
+        if self.snr is not None:
+            parts.append(f"SNR {self.snr:.1f} dB")
+        if self.mode != PEAK_HOLD:
+            parts.append(f"提高 {self.improvement:.1f} dB")
+        parts.append(f"每次 {self.seconds * 1000:.0f} ms"
+                     f"（累加 {self.accumulate_seconds * 1000:.1f} ms）")
+        return "  ".join(parts)
+
+
+class Averager(object):
+    """
+    采样值与幅度谱的原地累加。
+
+    begin 开始一次平均并返回编号，add 与 result 只接受最近一次 begin 的编号，
+    被取代的后台线程稍后完成的采集不会混入新的平均。
+    """
+    def __init__(self, mode=LINEAR, count=DEFAULT_COUNT):
+        """
+        Constructor
+
+        @param mode 平均方式
+        @type str
+        @param count 平均次数 K
+        @type int
+        """
+        self.mode = mode
+        self.count = count
+        self.lock = threading.Lock()
+        self.token = 0
+        self.key = None
+        self.y = None
+        self.xf = None
+        self.yf = None
+        self.added = 0
+        self.accumulate_seconds = 0.0
+        self.start = 0.0
+        self.reset()
+
+    def reset(self):
+        """清空累加值；数组保留，参数不变时继续使用。"""
+        with self.lock:
+            self.averages = 0
+            self.gain = 1.0
+            self.noise_sum = 0.0
+            self.noise_count = 0
+            self.key = None
+
+    def set_mode(self, mode, count):
+        """
+        更换平均方式与平均次数，并清空累加值。
+
+        @param mode 平均方式
+        @type str
+        @param count 平均次数 K
+        @type int
+        """
+        self.mode = mode
+        self.count = max(int(count), 1)
+        self.reset()
+
+    def begin(self, key):
+        """
+        开始一次平均。线性平均总是重新开始；其他方式在 key 改变时重新开始。
+
+        @param key 采集参数，不同的参数不能平均在一起
+        @type object
+        @return 本次平均的编号
+        @rtype int
+        """
+        with self.lock:
+            self.token += 1
+            if self.mode == LINEAR or key != self.key:
+                self.averages = 0
+                self.gain = 1.0
+                self.noise_sum = 0.0
+                self.noise_count = 0
+            self.key = key
+            self.added = 0
+            self.accumulate_seconds = 0.0
+            self.start = time.perf_counter()
+            return self.token
+
+    def weight(self, n):
+        """第 n 次采集的权重，n 从 1 开始。"""
+        if self.mode == LINEAR:
+            return 1.0 / n
+        if self.mode == EXPONENTIAL:
+            return max(1.0 / n, 1.0 / self.count)
+        return 1.0
+
+    def add(self, token, y, xf, yf):
+        """
+        把一次采集累加到平均中。y 与 yf 被用作临时数组，调用后内容不再有效。
+
+        @param token begin 返回的编号
+        @type int
+        @param y 采样值
+        @type numpy.ndarray
+        @param xf 频谱的频率
+        @type numpy.ndarray
+        @param yf 幅度谱
+        @type numpy.ndarray
+        @return 是否已累加，编号已被取代时为 False
+        @rtype bool
+        """
+        with self.lock:
+            if token != self.token:
+                return False
+            start = time.perf_counter()
+            if (self.y is None or self.y.shape != y.shape
+                    or self.y.dtype != y.dtype or self.yf.shape != yf.shape
+                    or self.yf.dtype != yf.dtype):
+                self.y = np.empty_like(y)
+                self.yf = np.empty_like(yf)
+                self.averages = 0
+                self.noise_sum = 0.0
+                self.noise_count = 0
+            if self.averages == 0:
+                np.copyto(self.y, y)
+                np.copyto(self.yf, yf)
+                self.xf = xf
+                self.gain = 1.0
+            else:
+                w = self.weight(self.averages + 1)
+                # y 变为与累加值的偏差，只含噪声。
+                y -= self.y
+                power = float(np.dot(y, y)) / len(y) if len(y) else 0.0
+                self.noise_sum += power / (1.0 + self.gain)
+                self.noise_count += 1
+                y *= w
+                self.y += y
+                self.gain = (1.0 - w) ** 2 * self.gain + w * w
+                if self.mode == PEAK_HOLD:
+                    np.maximum(self.yf, yf, out=self.yf)
+                else:
+                    yf -= self.yf
+                    yf *= w
+                    self.yf += yf
+            self.averages += 1
+            self.added += 1
+            self.accumulate_seconds += time.perf_counter() - start
+            return True
+
+    def result(self, token):
+        """
+        当前的平均结果，采样值与幅度谱为累加数组的副本，之后的累加不会
+        改变已经显示的数据。
+
+        @param token begin 返回的编号
+        @type int
+        @return 采样值、频率、幅度谱与统计，编号已被取代或尚未累加时为 None
+        @rtype tuple of (numpy.ndarray, numpy.ndarray, numpy.ndarray,
+            AverageStats)
+        """
+        with self.lock:
+            if token != self.token or not self.averages:
+                return None
+            added = max(self.added, 1)
+            seconds = (time.perf_counter() - self.start) / added
+            snr = None
+            if self.noise_count:
+                noise = self.noise_sum / self.noise_count * self.gain
+                N = len(self.y)
+                mean = float(self.y.sum(dtype=np.float64)) / N
+                signal = float(np.dot(self.y, self.y)) / N - mean * mean \
+                    - noise
+                if noise > 0 and signal > 0:
+                    snr = 10 * np.log10(signal / noise)
+            stats = AverageStats(self.mode, self.averages, self.count, snr,
+                                 -10 * np.log10(self.gain), seconds,
+                                 self.accumulate_seconds / added)
+            return self.y.copy(), self.xf, self.yf.copy(), stats
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+批量处理导出的采样文件。
+
+不需要图形界面：目录中的每个文件（*.mcs 二进制采样文件或 *.txt 文本文件）
+交给进程池中的一个进程读取、计算频谱并测量，最后输出最大幅值、周期、频率
+与频谱中最大的几个峰值的汇总表，以及按文件数与采样点数计算的吞吐量。
+
+用法：
+    python batch.py 目录 [--pattern *.mcs] [--jobs N] [--welch]
+                    [--peak-frequency] [--peaks 3] [--output 汇总.csv]
+"""
+
+import argparse
+import csv
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+# 计算模块在用到时才导入 SciPy。这里预先导入，fork 出的各子进程不必再分别
+# 导入。
+import scipy.fft  # noqa: F401
+import scipy.signal  # noqa: F401
+
+import analysis
+import spectrum
+from acquisition import load_file
+
+DEFAULT_PATTERNS = "*.mcs,*.txt"
+
+
+def init_worker():
+    """
+    子进程的初始化。文件已经分给各个进程并行处理，每个进程的 FFT 只用一个
+    线程，避免 --jobs 个进程各自再开 CPU 核心数个线程。
+    """
+    spectrum.WORKERS = 1
+
+
+def process(file_name, settings, peaks, dtype):
+    """
+    在子进程中处理一个文件。
+
+    @param file_name 文件路径
+    @type str
+    @param settings 频谱设置
+    @type spectrum.SpectrumSettings
+    @param peaks 列出的频谱峰值个数
+    @type int
+    @param dtype 文本文件中采样值的数据类型
+    @type numpy.dtype
+    @return 一行汇总，出错时只有文件名与错误信息
+    @rtype dict
+    """
+    start = time.perf_counter()
+    try:
+        acquisition = load_file(file_name, dtype=dtype)
+        result = analysis.analyze(acquisition, settings)
+        amplitude, period, frequency = result.features
+        row = {"file": file_name, "N": acquisition.N,
+               "f_s": acquisition.f_s, "amplitude": float(amplitude),
+               "period": float(period), "frequency": float(frequency),
+               "peaks": analysis.dominant_peaks(result.xf, result.yf, peaks,
+                                                settings.spectrum_window)}
+    except Exception as err:
+        row = {"file": file_name, "N": 0, "error": str(err)}
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+
+def find_files(directory, patterns):
+    """
+    按文件名模式列出目录中的文件，不进入子目录。
+
+    @param directory 目录
+    @type str
+    @param patterns 逗号分隔的文件名模式
+    @type str
+    @return 按文件名排序的文件路径
+    @rtype list of str
+    """
+    patterns = patterns.split(",")
+    return sorted(os.path.join(directory, name)
+                  for name in os.listdir(directory)
+                  if any(fnmatch.fnmatch(name, p) for p in patterns)
+                  and os.path.isfile(os.path.join(directory, name)))
+
+
+def format_peaks(peaks):
+    """把频谱峰值写成 "频率 Hz (幅值 V)" 的列表。"""
+    return "; ".join(f"{f:.2f} Hz ({a:.4f} V)" for f, a in peaks)
+
+
+def write_csv(file_name, rows):
+    """把汇总表写入 CSV 文件。"""
+    with open(file_name, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["file", "N", "f_s", "amplitude", "period",
+                         "frequency", "peaks", "seconds", "error"])
+        for row in rows:
+            writer.writerow([row["file"], row["N"], row.get("f_s", ""),
+                             row.get("amplitude", ""), row.get("period", ""),
+                             row.get("frequency", ""),
+                             format_peaks(row.get("peaks", [])),
+                             f"{row['seconds']:.4f}", row.get("error", "")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("directory", help="导出文件所在的目录")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERNS,
+                        help=f"逗号分隔的文件名模式，默认 {DEFAULT_PATTERNS}")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="进程数，默认为 CPU 核心数")
+    parser.add_argument("--welch", action="store_true",
+                        help="用 Welch 平均计算频谱，默认单次 FFT")
+    parser.add_argument("--nperseg", type=int, default=4096,
+                        help="Welch 分段长度，默认 4096")
+    parser.add_argument("--peak-frequency", action="store_true",
+                        help="由频谱峰值估计频率，默认由过零次数估计")
+    parser.add_argument("--peaks", type=int, default=analysis.PEAK_COUNT,
+                        help=f"列出的频谱峰值个数，默认 "
+                             f"{analysis.PEAK_COUNT}")
+    parser.add_argument("--float32", action="store_true",
+                        help="文本文件按 float32 读取")
+    parser.add_argument("--output", help="把汇总表写入 CSV 文件")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} 不是目录。")
+    files = find_files(args.directory, args.pattern)
+    if not files:
+        print(f"{args.directory} 中没有匹配 {args.pattern} 的文件。",
+              file=sys.stderr)
+        return 1
+    settings = spectrum.SpectrumSettings(
+        spectrum.WELCH if args.welch else spectrum.SINGLE, args.nperseg,
+        peak_frequency=args.peak_frequency)
+    dtype = np.float32 if args.float32 else np.float64
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs,
+                             initializer=init_worker) as executor:
+        rows = list(executor.map(process, files,
+                                 [settings] * len(files),
+                                 [args.peaks] * len(files),
+                                 [dtype] * len(files)))
+    elapsed = time.perf_counter() - start
+
+    name_width = max(len(os.path.basename(f)) for f in files)
+    print(f"{'file':<{name_width}} {'N':>10} {'f_s (Hz)':>10} "
+          f"{'amp (V)':>8} {'period (s)':>11} {'freq (Hz)':>11}  peaks")
+    for row in rows:
+        name = os.path.basename(row["file"])
+        if "error" in row:
+            print(f"{name:<{name_width}} 错误：{row['error']}")
+            continue
+        print(f"{name:<{name_width}} {row['N']:>10} {row['f_s']:>10g} "
+              f"{row['amplitude']:>8.4f} {row['period']:>11.6f} "
+              f"{row['frequency']:>11.2f}  {format_peaks(row['peaks'])}")
+
+    samples = sum(row["N"] for row in rows)
+    failed = sum("error" in row for row in rows)
+    print(f"{len(rows)} 个文件（失败 {failed} 个），{samples} 个采样点，"
+          f"用时 {elapsed:.2f} s：{len(rows) / elapsed:.1f} files/s，"
+          f"{samples / elapsed:.3g} samples/s")
+
+    if args.output:
+        write_csv(args.output, rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
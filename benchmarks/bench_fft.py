@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+FFT 阶段的基准测试。
+
+比较原来的实现（复数 fft + fftfreq + 掩码取非负频率）与 spectrum.fft_spectrum
+的几种方式：rfft 单线程、rfft 多线程、rfft 多线程并补零到 next_fast_len。
+采样频率覆盖界面允许的 0.1 ~ 400 kHz，其中 123.7 kHz 与 399.7 kHz 的点数含有
+较大的质因数。
+
+用法：
+    python benchmarks/bench_fft.py [-T 秒] [--rates kHz,kHz,...] [--json 文件]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from scipy.fft import fft, fftfreq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spectrum  # noqa: E402
+
+DEFAULT_RATES = "0.1,1,10,100,123.7,399.7,400"
+
+
+def original(y, f_s):
+    """改动前 MCS.plot 中的 FFT 阶段。"""
+    N = len(y)
+    yf2 = fft(y)
+    f = fftfreq(N, 1.0 / f_s)
+    mask = np.where(f >= 0)
+    return f[mask], abs(yf2[mask] / N)
+
+
+def single_thread(y, f_s):
+    """rfft，单线程。"""
+    workers = spectrum.WORKERS
+    spectrum.WORKERS = 1
+    try:
+        return spectrum.fft_spectrum(y, f_s)
+    finally:
+        spectrum.WORKERS = workers
+
+
+def multi_thread(y, f_s):
+    """rfft，多线程。"""
+    return spectrum.fft_spectrum(y, f_s)
+
+
+def fast_len(y, f_s):
+    """rfft，多线程，补零到 next_fast_len。"""
+    return spectrum.fft_spectrum(y, f_s, fast_len=True)
+
+
+METHODS = [original, single_thread, multi_thread, fast_len]
+
+
+def best_of(func, repeat, *args):
+    """返回 repeat 次运行中最短的耗时（s）。"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-T", type=float, default=10,
+                        help="采样时间（s），默认 10")
+    parser.add_argument("--rates", default=DEFAULT_RATES,
+                        help=f"采样频率（kHz），默认 {DEFAULT_RATES}")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="每项重复次数，取最短时间，默认 3")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    print(f"{'f_s (kHz)':>10} {'N':>10} "
+          + " ".join(f"{m.__name__:>14}" for m in METHODS) + "  speedup")
+    for rate in args.rates.split(","):
+        f_s = float(rate) * 1000
+        N = int(round(args.T * f_s))
+        y = rng.standard_normal(N)
+        times = {m.__name__: best_of(m, args.repeat, y, f_s)
+                 for m in METHODS}
+        best = min(times[m.__name__] for m in METHODS[1:])
+        speedup = times["original"] / best
+        results.append({"f_s": f_s, "N": N, "T": args.T, "times": times,
+                        "speedup": speedup})
+        print(f"{float(rate):>10} {N:>10} "
+              + " ".join(f"{times[m.__name__] * 1000:>12.1f}ms"
+                         for m in METHODS)
+              + f"  {speedup:6.1f}x")
+
+    # 相同 (N, f_s) 再次计算时频率轴直接取自缓存。
+    spectrum.clear_frequencies()
+    N = int(args.T * 400000)
+    cold = best_of(lambda: (spectrum.clear_frequencies(),
+                            spectrum.frequencies(N, 400000.0)), args.repeat)
+    warm = best_of(spectrum.frequencies, args.repeat, N, 400000.0)
+    print(f"frequency axis N={N}: cold {cold * 1000:.2f} ms, "
+          f"cached {warm * 1e6:.2f} us")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"cpu_count": os.cpu_count(), "results": results,
+                       "frequencies": {"cold": cold, "cached": warm}},
+                      file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
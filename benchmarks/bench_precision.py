@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+float64 与 float32 两种精度的峰值内存与测量误差对比。
+
+每种精度依次完成一次采集的全部计算（合成、单次 FFT 与 Welch 频谱、测量、
+绘图抽取），用 tracemalloc 记录 numpy 数组的峰值内存与计算结束时仍持有的
+内存（含波形缓存）。scipy.fft 内部的临时缓冲区不经过 tracemalloc，不计入。
+
+误差一项把同一段 float64 采样值转换为 float32 后分别测量，只反映精度的影响，
+与噪声无关。
+
+用法：
+    python benchmarks/bench_precision.py [-T 秒] [--rates kHz,kHz,...]
+                                         [--json 文件]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import measurement  # noqa: E402
+import spectrum  # noqa: E402
+import synthesis  # noqa: E402
+from decimate import MinMaxPyramid  # noqa: E402
+
+DEFAULT_RATES = "10,100,400"
+DTYPES = [np.float64, np.float32]
+MB = 1 << 20
+
+# 预热时的采样频率（Hz），采样时间 1 s，点数不小于 Welch 的默认分段长度。
+WARM_UP_RATE = 8192.0
+
+
+def pipeline(f_s, T, dtype):
+    """
+    按界面的顺序完成一次采集的计算，返回结果以免被提前释放。
+
+    @return 采样值、频谱、测量结果与抽取金字塔
+    @rtype tuple
+    """
+    waveform_cache = synthesis.WaveformCache()
+    y, (xf, yf) = synthesis.synthesize(synthesis.SINE, 1000.0, (5, 5),
+                                       f_s, T, waveform_cache=waveform_cache,
+                                       dtype=dtype)
+    welch = spectrum.welch_spectrum(y, f_s)
+    features = measurement.measure(y, len(y) / f_s)
+    pyramids = (MinMaxPyramid(y, 0.0, 1 / f_s), MinMaxPyramid(yf, 0.0, xf[1]))
+    return waveform_cache, y, yf, welch, features, pyramids
+
+
+def warm_up():
+    """
+    每种精度先以少量点数运行一次，不计入结果。SciPy 在第一次用到时才导入，
+    否则导入的时间与内存会计入第一个测量的 float64。
+    """
+    for dtype in DTYPES:
+        pipeline(WARM_UP_RATE, 1.0, dtype)
+
+
+def profile(f_s, T, dtype):
+    """返回峰值内存、结束时持有的内存（字节）与耗时（s）。"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = pipeline(f_s, T, dtype)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, current, elapsed
+
+
+def errors(f_s, T):
+    """同一段数据转换为 float32 后，测量结果与频谱相对 float64 的误差。"""
+    y64, _ = synthesis.synthesize(
+        synthesis.SINE, 1000.0, (5, 5), f_s, T,
+        waveform_cache=synthesis.WaveformCache())
+    y32 = y64.astype(np.float32)
+    amplitude64, period64, freq64 = measurement.measure(y64, T)
+    amplitude32, period32, freq32 = measurement.measure(y32, T)
+    _, yf32 = spectrum.fft_spectrum(y32, f_s)
+    _, yf64 = spectrum.fft_spectrum(y64, f_s)
+    return {"amplitude": abs(amplitude32 - amplitude64),
+            "frequency": abs(freq32 - freq64) / freq64,
+            "spectrum": float(np.max(np.abs(yf32 - yf64)))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-T", type=float, default=10,
+                        help="采样时间（s），默认 10")
+    parser.add_argument("--rates", default=DEFAULT_RATES,
+                        help=f"采样频率（kHz），默认 {DEFAULT_RATES}")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    warm_up()
+    results = []
+    print(f"{'f_s (kHz)':>10} {'N':>10} {'dtype':>8} {'peak':>10} "
+          f"{'held':>10} {'time':>9}")
+    for rate in args.rates.split(","):
+        f_s = float(rate) * 1000
+        N = int(round(args.T * f_s))
+        row = {"f_s": f_s, "N": N, "T": args.T}
+        for dtype in DTYPES:
+            name = np.dtype(dtype).name
+            peak, held, elapsed = profile(f_s, args.T, dtype)
+            row[name] = {"peak": peak, "held": held, "time": elapsed}
+            print(f"{float(rate):>10} {N:>10} {name:>8} "
+                  f"{peak / MB:>8.1f}MB {held / MB:>8.1f}MB "
+                  f"{elapsed * 1000:>7.0f}ms")
+        row["peak_ratio"] = row["float32"]["peak"] / row["float64"]["peak"]
+        row["errors"] = errors(f_s, args.T)
+        print(f"{'':>10} float32/float64 peak {row['peak_ratio']:.2f}; "
+              f"amplitude error {row['errors']['amplitude']:.2e} V, "
+              f"frequency error {row['errors']['frequency']:.2e}, "
+              f"spectrum error {row['errors']['spectrum']:.2e} V")
+        results.append(row)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
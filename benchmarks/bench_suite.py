@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+合成、FFT、测量、文件读写与绘图各阶段的基准测试。
+
+不需要显示器：Qt 使用 offscreen 平台，画布由 Agg 渲染。按采样频率与采样时间
+的组合（最大为界面允许的 400 kHz、100 s）依次测量各阶段：
+
+    synthesize_cold  synthesis.synthesize，波形缓存为空
+    synthesize_warm  synthesis.synthesize，波形取自缓存
+    generate_block   synthesis.generate_block，直接在时域中生成
+    fft_single       spectrum.fft_spectrum，单次 rfft
+    fft_welch        spectrum.welch_spectrum，默认参数
+    spectrogram      spectrogram.Spectrogram，整段记录的概览
+    measure          measurement.measure，逐块扫描
+    spectral_peak    measurement.spectral_peak
+    write_binary     Acquisition.write_binary
+    read_binary      acquisition.load_file 并读遍全部采样值
+    write_text       Acquisition.write_text
+    read_text        acquisition.load_file 解析文本文件
+    pyramid          decimate.MinMaxPyramid
+    canvas_plot      canvas.Canvas.plot，完整重绘
+    canvas_replot    canvas.Canvas.plot，坐标范围不变，只 blit 折线
+
+每项取 --repeat 次运行中最短的耗时，另外在 tracemalloc 下运行一次记录 numpy
+数组的峰值内存。结果写成 JSON，--compare 与之前的结果逐项比较。文本格式
+很慢，点数超过 --text-max-points 时跳过文本读写。
+
+用法：
+    python benchmarks/bench_suite.py [--rates kHz,...] [--durations s,...]
+        [--stages 阶段,...] [--repeat 3] [--json 文件] [--compare 文件]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    # 只有 Unix 上有 resource 模块，Windows 上不报告最大常驻内存。
+    import resource
+except ImportError:
+    resource = None
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import matplotlib  # noqa: E402
+import numpy as np  # noqa: E402
+import scipy  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import measurement  # noqa: E402
+import spectrum  # noqa: E402
+import synthesis  # noqa: E402
+from spectrogram import Spectrogram  # noqa: E402
+from acquisition import Acquisition, load_file  # noqa: E402
+from decimate import MinMaxPyramid  # noqa: E402
+
+DEFAULT_RATES = "1,10,100,400"
+DEFAULT_DURATIONS = "1,10,100"
+TEXT_MAX_POINTS = 4000000
+
+# 合成所用的信号：正弦波，1 kHz，0~10 V。
+WAVE = synthesis.SINE
+FREQ = 1000.0
+AMPLITUDE = (5, 5)
+
+
+class Case(object):
+    """一组 (f_s, T) 的测试数据与各阶段共用的中间结果。"""
+    def __init__(self, f_s, T, directory):
+        self.f_s = f_s
+        self.T = T
+        self.N = int(round(T * f_s))
+        # 合成测试数据的同时填充波形缓存，供 synthesize_warm 使用。
+        self.waveform_cache = synthesis.WaveformCache()
+        y, (self.xf, self.yf) = synthesis.synthesize(
+            WAVE, FREQ, AMPLITUDE, f_s, T,
+            waveform_cache=self.waveform_cache)
+        self.acquisition = Acquisition(y, f_s, 0.0, (0.0, 10.0))
+        self.binary_file = os.path.join(directory, "bench.mcs")
+        self.text_file = os.path.join(directory, "bench.txt")
+        self.acquisition.write_binary(self.binary_file)
+        self.text_ready = False
+        self.pyramid = None
+
+    def write_text(self):
+        with open(self.text_file, "w") as file:
+            self.acquisition.write_text(file)
+        self.text_ready = True
+
+
+def read_binary(case):
+    """读取二进制文件并读遍全部采样值。"""
+    y = load_file(case.binary_file).y
+    return float(np.sum(y))
+
+
+def canvas_plot(case, canvas, full=True):
+    """绘制采样波形；full 为 True 时丢弃缓存的背景，强制完整重绘。"""
+    if case.pyramid is None:
+        case.pyramid = MinMaxPyramid(case.acquisition.y, 0.0,
+                                     case.acquisition.dt)
+    if full:
+        canvas.background = None
+    canvas.plot(case.pyramid, "Time(s)", "Amplitude(V)", "Sampled waveform",
+                "C0", "w", None)
+
+
+def make_stages(canvas):
+    """各阶段的名称与函数，函数的参数为 Case。"""
+    return [
+        ("synthesize_cold", lambda c: synthesis.synthesize(
+            WAVE, FREQ, AMPLITUDE, c.f_s, c.T,
+            waveform_cache=synthesis.WaveformCache())),
+        ("synthesize_warm", lambda c: synthesis.synthesize(
+            WAVE, FREQ, AMPLITUDE, c.f_s, c.T,
+            waveform_cache=c.waveform_cache)),
+        ("generate_block", lambda c: synthesis.generate_block(
+            WAVE, FREQ, AMPLITUDE, c.f_s, c.N)),
+        ("fft_single", lambda c: spectrum.fft_spectrum(c.acquisition.y,
+                                                       c.f_s)),
+        ("fft_welch", lambda c: spectrum.welch_spectrum(c.acquisition.y,
+                                                        c.f_s)),
+        ("spectrogram", lambda c: Spectrogram(c.acquisition.y, c.f_s)),
+        ("measure", lambda c: measurement.measure(c.acquisition.y, c.T)),
+        ("spectral_peak", lambda c: measurement.spectral_peak(c.xf, c.yf)),
+        ("write_binary", lambda c: c.acquisition.write_binary(
+            c.binary_file)),
+        ("read_binary", read_binary),
+        ("write_text", lambda c: c.write_text()),
+        ("read_text", lambda c: load_file(c.text_file)),
+        ("pyramid", lambda c: MinMaxPyramid(c.acquisition.y, 0.0,
+                                            c.acquisition.dt)),
+        ("canvas_plot", lambda c: canvas_plot(c, canvas)),
+        ("canvas_replot", lambda c: canvas_plot(c, canvas, full=False)),
+    ]
+
+
+def run_stage(func, case, repeat):
+    """返回各次耗时（s）与 tracemalloc 记录的峰值内存（字节）。"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(case)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(case)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak
+
+
+def make_canvas():
+    """创建 offscreen 的 QApplication 与画布。"""
+    from PyQt5.QtWidgets import QApplication
+    from canvas import Canvas
+
+    app = QApplication.instance() or QApplication([])
+    canvas = Canvas()
+    canvas.resize(800, 400)
+    canvas.show()
+    app.processEvents()
+    return app, canvas
+
+
+def metadata(args):
+    """运行环境，便于比较不同机器上的结果。"""
+    return {"python": platform.python_version(),
+            "numpy": np.__version__, "scipy": scipy.__version__,
+            "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args)}
+
+
+def compare(results, file_name):
+    """与之前的结果逐项比较，输出耗时与峰值内存之比。"""
+    with open(file_name) as file:
+        baseline = {(r["stage"], r["f_s"], r["T"]): r
+                    for r in json.load(file)["results"]}
+    print(f"\n与 {file_name} 比较（当前 / 之前）：")
+    for r in results:
+        old = baseline.get((r["stage"], r["f_s"], r["T"]))
+        if old is None or "time" not in r or "time" not in old:
+            continue
+        print(f"{r['stage']:<16} {r['f_s'] / 1000:>7g} kHz {r['T']:>5g} s "
+              f"time {r['time'] / old['time']:6.2f}x "
+              f"peak {r['peak'] / max(old['peak'], 1):6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", default=DEFAULT_RATES,
+                        help=f"采样频率（kHz），默认 {DEFAULT_RATES}")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS,
+                        help=f"采样时间（s），默认 {DEFAULT_DURATIONS}")
+    parser.add_argument("--stages", help="只运行这些阶段，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="每项重复次数，取最短时间，默认 3")
+    parser.add_argument("--text-max-points", type=int,
+                        default=TEXT_MAX_POINTS,
+                        help=f"文本读写的最大点数，默认 {TEXT_MAX_POINTS}")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前写出的 JSON 结果比较")
+    args = parser.parse_args()
+
+    app, canvas = make_canvas()
+    stages = make_stages(canvas)
+    if args.stages:
+        selected = args.stages.split(",")
+        unknown = set(selected) - {name for name, _ in stages}
+        if unknown:
+            parser.error(f"未知的阶段：{', '.join(sorted(unknown))}")
+        stages = [(name, func) for name, func in stages if name in selected]
+
+    results = []
+    print(f"{'stage':<16} {'f_s':>11} {'T':>7} {'N':>10} {'time':>11} "
+          f"{'peak':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for T in (float(t) for t in args.durations.split(",")):
+            for f_s in (float(r) * 1000 for r in args.rates.split(",")):
+                case = Case(f_s, T, directory)
+                for name, func in stages:
+                    row = {"stage": name, "f_s": f_s, "T": T, "N": case.N}
+                    if name.endswith("_text") and \
+                            case.N > args.text_max_points:
+                        row["skipped"] = "text_max_points"
+                        results.append(row)
+                        continue
+                    if name == "read_text" and not case.text_ready:
+                        case.write_text()
+                    times, peak = run_stage(func, case, args.repeat)
+                    row.update(time=min(times), times=times, peak=peak)
+                    results.append(row)
+                    print(f"{name:<16} {f_s / 1000:>7g} kHz {T:>5g} s "
+                          f"{case.N:>10} {min(times) * 1000:>9.2f}ms "
+                          f"{peak / (1 << 20):>8.1f}MB")
+                del case
+
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        print(f"max RSS {max_rss / (1 << 20):.0f} MB")
+    else:
+        max_rss = None
+        print("max RSS unavailable")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"meta": metadata(args), "max_rss": max_rss,
+                       "results": results}, file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    canvas.close()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
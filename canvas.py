@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing Canvas and SpectrogramCanvas.
+
+导入 matplotlib 的 Qt 后端需要较长时间，主窗口在首次绘制之后才导入本模块并
+创建画布。
+"""
+
+import numpy as np
+
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtWidgets import QSizePolicy
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import (NavigationToolbar2QT
+                                                as NavigationToolbar)
+from matplotlib.figure import Figure
+
+from worker import SpectrogramThread
+
+
+class Canvas(FigureCanvas):
+    """
+    matplotlib 画布。
+
+    折线与坐标轴装饰在画布生命周期内只创建一次，重新绘制时只更新数据。
+    坐标范围与装饰不变时，只把折线画到缓存的背景上（blit），不重绘整张图；
+    tight_layout 也只在装饰改变或画布尺寸变化时重新计算。
+
+    缩放或拖动改变横轴范围后发出 xlimChanged，新数据引起的范围变化不发出。
+    """
+    xlimChanged = pyqtSignal(float, float)
+
+    def __init__(self, parent=None, width=5, height=4, dpi=100,
+                 xlabel="Time(s)", title="Sampled waveform"):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.add_subplot(111)
+        self.axes.set_ylabel("Amplitude(V)")
+        self.axes.set_xlabel(xlabel)
+        self.axes.set_title(title)
+
+        FigureCanvas.__init__(self, fig)
+        self.setParent(parent)
+
+        FigureCanvas.setSizePolicy(self,
+                                   QSizePolicy.Expanding,
+                                   QSizePolicy.Expanding)
+        FigureCanvas.updateGeometry(self)
+
+        self.pyramid = None
+        # 折线设为 animated，完整重绘时不画它，由 on_draw 画在背景之上。
+        self.line, = self.axes.plot([], [], "C0", animated=True)
+        self.decoration = (xlabel, "Amplitude(V)", title, None, None)
+        self.background = None
+        self.layout_dirty = True
+        self.updating = False
+        self.axes.callbacks.connect("xlim_changed", self.on_xlim_changed)
+        self.mpl_connect("draw_event", self.on_draw)
+
+    def compute_initial_figure(self):
+        pass
+
+    def draw(self):
+        """完整重绘，需要时先重新计算布局。"""
+        if self.layout_dirty:
+            self.layout_dirty = False
+            self.figure.tight_layout()
+        FigureCanvas.draw(self)
+
+    def resizeEvent(self, event):
+        """画布尺寸变化后需要重新计算布局。"""
+        self.layout_dirty = True
+        FigureCanvas.resizeEvent(self, event)
+
+    def on_draw(self, event):
+        """完整重绘后缓存不含折线的背景，再把折线画上去。"""
+        self.background = self.copy_from_bbox(self.axes.bbox)
+        self.axes.draw_artist(self.line)
+
+    def blit_line(self):
+        """在缓存的背景上只重绘折线。"""
+        self.restore_region(self.background)
+        self.axes.draw_artist(self.line)
+        self.blit(self.axes.bbox)
+
+    def visible_points(self, xlim=None):
+        """按可见的横轴范围与绘图区宽度抽取要绘制的点，默认为当前范围。"""
+        xmin, xmax = xlim if xlim else self.axes.get_xlim()
+        return self.pyramid.decimate(xmin, xmax, self.axes.bbox.width)
+
+    def on_xlim_changed(self, axes):
+        """缩放或拖动后，只对可见范围重新抽取数据。"""
+        if self.pyramid is not None and not self.updating:
+            self.line.set_data(*self.visible_points())
+            self.draw_idle()
+            self.xlimChanged.emit(*self.axes.get_xlim())
+
+    def set_decoration(self, xlabel, ylabel, title, face_color, fig_color):
+        """
+        设置坐标轴标签、标题与颜色。
+
+        @return 装饰是否发生变化
+        @rtype bool
+        """
+        decoration = (xlabel, ylabel, title, face_color, fig_color)
+        if decoration == self.decoration:
+            return False
+        self.decoration = decoration
+        self.axes.set_xlabel(xlabel)
+        self.axes.set_ylabel(ylabel)
+        self.axes.set_title(title)
+        self.axes.set_facecolor(face_color)
+        if fig_color:
+            self.figure.set_facecolor(fig_color)
+        self.layout_dirty = True
+        return True
+
+    def restyle(self, color, face_color, fig_color):
+        """
+        只改变折线、坐标区与图形的颜色，数据与坐标范围不变，不重新抽取。
+
+        @param color 折线颜色
+        @type str
+        @param face_color 坐标区背景颜色
+        @type str
+        @param fig_color 图形背景颜色，None 时不改变
+        @type str
+        """
+        self.line.set_color(color)
+        xlabel, ylabel, title = self.decoration[:3]
+        self.set_decoration(xlabel, ylabel, title, face_color, fig_color)
+        self.draw()
+
+    def similar_limits(self, limits):
+        """
+        判断新数据是否完全落在原坐标范围内，且自动缩放后的范围与原范围
+        相差不到 10%。
+        """
+        data = self.axes.dataLim
+        for (low, high), (new_low, new_high), (d_low, d_high) in zip(
+                limits, (self.axes.get_xlim(), self.axes.get_ylim()),
+                (data.intervalx, data.intervaly)):
+            if d_low < low or d_high > high:
+                return False
+            if (new_high - new_low) < 0.9 * (high - low):
+                return False
+        return True
+
+    def plot(self, pyramid, xlabel, ylabel, title, color, face_color,
+             fig_color):
+        """
+        绘制等间隔的数据。传给 matplotlib 的只是每个像素列的最小/最大值，
+        外形与绘制全部数据相同，横坐标也只为这些点计算。pyramid 可以预先在
+        后台线程中构建。
+
+        @param pyramid 数据的抽取金字塔
+        @type MinMaxPyramid
+        """
+        self.pyramid = pyramid
+        changed = self.set_decoration(xlabel, ylabel, title, face_color,
+                                      fig_color)
+        self.line.set_color(color)
+
+        # 首次绘制整个范围，自动缩放得到的坐标范围与绘制全部数据时一致。
+        N = len(pyramid.y)
+        xlim = (pyramid.x(0), pyramid.x(N - 1)) if N else (0, 0)
+        self.set_points(*self.visible_points(xlim), changed)
+
+    def set_points(self, x, y, changed=False):
+        """
+        更新折线上的点。坐标范围与装饰都不变时只 blit 折线，否则完整重绘。
+
+        @param x 要绘制的横坐标
+        @type numpy.ndarray
+        @param y 要绘制的纵坐标
+        @type numpy.ndarray
+        @param changed 装饰是否已经改变
+        @type bool
+        """
+        limits = self.axes.get_xlim(), self.axes.get_ylim()
+        self.updating = True
+        self.line.set_data(x, y)
+        self.axes.relim()
+        self.axes.autoscale(True)
+        if self.similar_limits(limits):
+            # 重复采集时噪声会让范围略有变化，数据仍在原范围内就沿用原范围。
+            self.axes.set_xlim(limits[0])
+            self.axes.set_ylim(limits[1])
+        self.updating = False
+
+        if (changed or self.background is None
+                or limits != (self.axes.get_xlim(), self.axes.get_ylim())):
+            # 坐标范围变化后刻度也要重画，旧的缩放记录不再有效。
+            if self.toolbar is not None:
+                self.toolbar.update()
+            self.draw()
+        else:
+            self.blit_line()
+
+
+class SpectrogramCanvas(Canvas):
+    """
+    时频图画布。图像由 imshow 绘制，只创建一次，之后只更新数据与坐标范围。
+    缩放或拖动停止 REFINE_DELAY 毫秒后，在后台线程 SpectrogramThread 中按
+    可见范围向 Spectrogram 取图像，放大到足够小的范围时时间分辨率随之提高。
+    同时只有一个线程在计算，期间的请求合并为结束后的一次；结果到达之前
+    显示概览。
+    """
+    REFINE_DELAY = 150
+    # 显示的动态范围（dB）。
+    DYNAMIC_RANGE = 100
+
+    def __init__(self, parent=None, width=5, height=4, dpi=100,
+                 title="Spectrogram"):
+        super(SpectrogramCanvas, self).__init__(parent, width, height, dpi,
+                                                "Time(s)", title)
+        self.spectrogram = None
+        self.current = None
+        self.image = self.axes.imshow(np.zeros((1, 1)), aspect="auto",
+                                      origin="lower",
+                                      interpolation="nearest")
+        # 坐标范围由 plot 与导航工具栏决定，更换图像时不自动缩放。
+        self.axes.set_autoscale_on(False)
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(self.REFINE_DELAY)
+        self.refine_timer.timeout.connect(self.refine)
+        self.refine_worker = None
+        self.refine_pending = False
+
+    def on_xlim_changed(self, axes):
+        """
+        缩放或拖动时推迟重新计算，连续拖动只在停止后计算一次。可见范围超出
+        当前的图像时立即改为显示概览，不留空白。
+        """
+        if self.spectrogram is None or self.updating:
+            return
+        overview = self.spectrogram.overview
+        if self.current is not overview:
+            xmin, xmax = self.axes.get_xlim()
+            left, right = self.current.extent[:2]
+            if xmin < left or xmax > right:
+                self.show_image(overview)
+        self.refine_timer.start()
+
+    def show_image(self, image):
+        """
+        以 dB 显示图像。
+
+        @param image 图像与坐标范围
+        @type spectrogram.SpectrogramImage
+        """
+        self.current = image
+        self.image.set_data(20 * np.log10(np.maximum(image.amplitude,
+                                                     1e-12)))
+        self.image.set_extent(image.extent)
+
+    def refine(self):
+        """按当前的可见范围在后台线程中重新计算图像。"""
+        if self.spectrogram is None:
+            return
+        if self.refine_worker is not None:
+            # 正在计算的结果已经过时，结束后再按最新的范围计算一次。
+            self.refine_pending = True
+            return
+        xmin, xmax = self.axes.get_xlim()
+        spectrogram, width = self.spectrogram, int(self.axes.bbox.width)
+        self.refine_worker = SpectrogramThread(
+            lambda: spectrogram.view(xmin, xmax, width), spectrogram, self)
+        self.refine_worker.resultReady.connect(self.show_refined)
+        self.refine_worker.finished.connect(self.on_refine_finished)
+        self.refine_worker.start()
+
+    def show_refined(self, image):
+        """显示可见范围的图像；计算期间时频图已更换时丢弃。"""
+        if self.sender().key is not self.spectrogram:
+            return
+        if image is not self.current:
+            self.show_image(image)
+            self.draw_idle()
+
+    def on_refine_finished(self):
+        """释放计算图像的线程，期间有新的请求时再计算一次。"""
+        self.refine_worker.deleteLater()
+        self.refine_worker = None
+        if self.refine_pending:
+            self.refine_pending = False
+            self.refine()
+
+    def wait_refine(self):
+        """停止推迟的计算，并等待正在计算的线程结束。"""
+        self.refine_timer.stop()
+        self.refine_pending = False
+        if self.refine_worker is not None:
+            self.refine_worker.wait()
+
+    def plot_spectrogram(self, spectrogram, xlabel, ylabel, title,
+                         face_color, fig_color):
+        """
+        绘制整段记录的时频图概览。
+
+        @param spectrogram 时频图，可以预先在后台线程中计算
+        @type spectrogram.Spectrogram
+        """
+        self.spectrogram = spectrogram
+        self.set_decoration(xlabel, ylabel, title, face_color, fig_color)
+        overview = spectrogram.overview
+        self.updating = True
+        self.show_image(overview)
+        vmax = float(np.max(self.image.get_array()))
+        self.image.set_clim(vmax - self.DYNAMIC_RANGE, vmax)
+        self.axes.set_xlim(overview.extent[:2])
+        self.axes.set_ylim(overview.extent[2:])
+        self.updating = False
+        if self.toolbar is not None:
+            self.toolbar.update()
+        self.draw()
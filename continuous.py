@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing ContinuousAcquisition.
+"""
+
+import time
+
+import numpy as np
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import spectrum
+import synthesis
+from acquisition import Acquisition
+
+# 产生数据与刷新画面的定时器间隔（ms）。
+PRODUCE_INTERVAL = 10
+FRAME_INTERVAL = 40
+
+# 落后超过该时长（s）的数据块直接丢弃，避免越积越多。
+MAX_BACKLOG = 0.25
+
+# 波形显示的列数，以及频谱所用的最大点数。
+DISPLAY_COLUMNS = 1024
+FFT_SIZE = 1 << 16
+
+
+class RingBuffer(object):
+    """预先分配的环形缓冲区，写入与读取都不重新分配内存。"""
+    def __init__(self, capacity, fill=np.nan, dtype=np.float64):
+        """
+        Constructor
+
+        @param capacity 容量（点数）
+        @type int
+        @param fill 初始值，默认为 NaN，尚未写入的部分不会被画出
+        @type float
+        @param dtype 数据类型
+        @type numpy.dtype
+        """
+        self.data = np.full(capacity, fill, dtype=dtype)
+        self.capacity = capacity
+        # 累计写入的点数，写入位置为 count % capacity。
+        self.count = 0
+
+    def write(self, block):
+        """写入一段数据，超出容量时覆盖最早的数据。"""
+        total = len(block)
+        block = block[-self.capacity:]
+        n = len(block)
+        head = (self.count + total - n) % self.capacity
+        first = min(n, self.capacity - head)
+        self.data[head:head + first] = block[:first]
+        self.data[:n - first] = block[first:]
+        self.count += total
+
+    def latest(self, out):
+        """按时间顺序把最近的 len(out) 个点复制到 out 中。"""
+        n = len(out)
+        head = self.count % self.capacity
+        start = (head - n) % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.data[start:start + first]
+        out[first:] = self.data[:n - first]
+        return out
+
+
+class ContinuousAcquisition(QObject):
+    """
+    示波器式的连续采样。
+
+    生产定时器按实际经过的时间把 generate_block 产生的数据块写入环形缓冲区；
+    每凑满一列就计算该列的最小/最大值写入包络环形缓冲区，因此刷新画面时只需
+    复制 DISPLAY_COLUMNS 列包络和最近 FFT_SIZE 个点，与显示的时间长度无关。
+    画面数组全部预先分配，每帧只在原地更新。
+    """
+    frameReady = pyqtSignal()
+
+    def __init__(self, f_s, T, settings, dtype=np.float64, parent=None):
+        """
+        Constructor
+
+        @param f_s 采样频率（Hz）
+        @type int
+        @param T 显示的时间长度（s）
+        @type float
+        @param settings 返回 (波形, 频率, 幅值) 的函数，每次产生数据时调用，
+            因此运行中切换波形或电压范围立即生效
+        @type callable
+        @param dtype 采样值的数据类型，float64 或 float32
+        @type numpy.dtype
+        @param parent reference to the parent object
+        @type QObject
+        """
+        super(ContinuousAcquisition, self).__init__(parent)
+        self.f_s = f_s
+        self.settings = settings
+
+        # 每个数据块为一个生产周期的点数。
+        self.block = max(1, int(np.ceil(f_s * PRODUCE_INTERVAL / 1000)))
+        window = max(2, int(T * f_s))
+        if window > 2 * DISPLAY_COLUMNS:
+            # 缓冲区长度取列宽的整数倍，每列在缓冲区中都是连续的。
+            self.column = window // DISPLAY_COLUMNS
+            window = self.column * DISPLAY_COLUMNS
+            self.mins = RingBuffer(DISPLAY_COLUMNS, dtype=dtype)
+            self.maxs = RingBuffer(DISPLAY_COLUMNS, dtype=dtype)
+            self.x = np.repeat(np.arange(DISPLAY_COLUMNS) * self.column / f_s,
+                               2)
+            self.y = np.full(2 * DISPLAY_COLUMNS, np.nan, dtype)
+        else:
+            self.column = None
+            self.x = np.arange(window) / f_s
+            self.y = np.full(window, np.nan, dtype)
+        self.ring = RingBuffer(window, dtype=dtype)
+        self.binned = 0
+
+        fft_size = min(window, FFT_SIZE)
+        self.fft_input = np.zeros(fft_size, dtype)
+        self.spectrum = np.zeros(fft_size // 2 + 1, dtype)
+        xf = spectrum.frequencies(fft_size, f_s)
+        if len(xf) > 2 * DISPLAY_COLUMNS:
+            # 频谱同样按列取最小/最大值后再绘制。
+            self.fft_column = len(xf) // DISPLAY_COLUMNS
+            self.xf = np.repeat(xf[:self.fft_column * DISPLAY_COLUMNS]
+                                [::self.fft_column], 2)
+            self.yf = np.zeros(2 * DISPLAY_COLUMNS, dtype)
+        else:
+            self.fft_column = None
+            self.xf = xf
+            self.yf = self.spectrum
+
+        # 生产数据用的随机数生成器与预先分配的缓冲区。
+        self.backlog = max(1, int(MAX_BACKLOG * f_s) // self.block)
+        self.rng = np.random.default_rng()
+        self.buffer = np.empty(self.backlog * self.block, dtype)
+
+        self.produced = 0
+        self.dropped = 0
+        self.frame_time = 0.0
+        self.start_time = None
+
+        self.produce_timer = QTimer(self)
+        self.produce_timer.setInterval(PRODUCE_INTERVAL)
+        self.produce_timer.timeout.connect(self.produce)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(FRAME_INTERVAL)
+        self.frame_timer.timeout.connect(self.refresh)
+
+    def start(self):
+        """开始连续采样。"""
+        self.start_time = time.perf_counter()
+        self.produce_timer.start()
+        self.frame_timer.start()
+
+    def stop(self):
+        """停止连续采样。"""
+        self.produce_timer.stop()
+        self.frame_timer.stop()
+
+    def produce(self):
+        """补齐从开始到现在应当产生的数据块。"""
+        elapsed = time.perf_counter() - self.start_time
+        due = int(elapsed * self.f_s) // self.block - self.produced
+        if due > self.backlog:
+            # 跟不上实时速度，丢弃最早的数据块，时间轴随之跳过。
+            self.dropped += due - self.backlog
+            self.produced += due - self.backlog
+            due = self.backlog
+        if due <= 0:
+            return
+
+        wave, freq, amplitude = self.settings()
+        n = due * self.block
+        self.ring.write(synthesis.generate_block(
+            wave, freq, amplitude, self.f_s, n, self.produced * self.block,
+            rng=self.rng, out=self.buffer[:n]))
+        self.produced += due
+        self.update_columns()
+
+    def update_columns(self):
+        """计算新凑满的各列的最小/最大值。"""
+        if self.column is None:
+            return
+        capacity = self.ring.capacity
+        # 比缓冲区还旧的列已被覆盖，不再计算。
+        self.binned = max(self.binned,
+                          (self.ring.count - capacity) // self.column
+                          * self.column)
+        while self.ring.count - self.binned >= self.column:
+            start = self.binned % capacity
+            stop = min(capacity,
+                       start + (self.ring.count - self.binned)
+                       // self.column * self.column)
+            columns = self.ring.data[start:stop].reshape(-1, self.column)
+            self.mins.write(columns.min(axis=1))
+            self.maxs.write(columns.max(axis=1))
+            self.binned += stop - start
+
+    def refresh(self):
+        """用最近的数据原地更新画面数组，并发出 frameReady。"""
+        frame_start = time.perf_counter()
+        if self.column is None:
+            self.ring.latest(self.y)
+        else:
+            self.mins.latest(self.y[0::2])
+            self.maxs.latest(self.y[1::2])
+
+        self.ring.latest(self.fft_input)
+        np.nan_to_num(self.fft_input, copy=False)
+        from scipy.fft import rfft
+
+        np.abs(rfft(self.fft_input), out=self.spectrum)
+        self.spectrum /= len(self.fft_input)
+        if self.fft_column is not None:
+            columns = self.spectrum[:len(self.yf) // 2 * self.fft_column]
+            columns = columns.reshape(-1, self.fft_column)
+            columns.min(axis=1, out=self.yf[0::2])
+            columns.max(axis=1, out=self.yf[1::2])
+
+        self.frameReady.emit()
+        self.frame_time = time.perf_counter() - frame_start
+
+    def snapshot(self, v_range=(0.0, 0.0)):
+        """
+        把环形缓冲区中的数据复制为一次采集，用于停止后的测量与导出。
+
+        @param v_range 输入电压范围 (下限, 上限)
+        @type tuple of float
+        @return 缓冲区中已写入的数据
+        @rtype Acquisition
+        """
+        n = min(self.ring.count, self.ring.capacity)
+        y = self.ring.latest(np.empty(n, self.ring.data.dtype))
+        t0 = (self.produced * self.block - n) / self.f_s
+        return Acquisition(y, self.f_s, t0, v_range)
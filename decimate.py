@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing min/max decimation for plotting large records.
+
+绘图区只有几百个像素宽，把几百万个点全部交给 matplotlib 既看不出区别又非常慢。
+这里对每个像素列只保留该列内采样值的最小值与最大值，画出来的折线与绘制全部
+数据时的外形一致。
+"""
+
+import numpy as np
+
+# 金字塔第一层每个区间包含的采样点数，以及相邻两层之间的倍数。
+BASE_BIN = 16
+LEVEL_FACTOR = 4
+
+# 区间数少于该值时不再向上构建金字塔。
+MIN_LEVEL_BINS = 1024
+
+
+def _reduce(values, bin_size, ufunc):
+    """按 bin_size 分组求 ufunc 归约，最后一组可以不满。"""
+    return ufunc.reduceat(values, np.arange(0, len(values), bin_size))
+
+
+class MinMaxPyramid(object):
+    """
+    采样数据的多级最小/最大值包络。
+
+    第 k 层每个区间覆盖 BASE_BIN * LEVEL_FACTOR ** k 个采样点。绘图时根据可见
+    范围内的点数选择合适的一层，再把该层的区间合并成每像素列一个区间，因此
+    缩放或拖动时只需处理可见范围，而不必重新扫描全部数据。
+
+    横坐标是等间隔的，第 k 个点为 x0 + k * dx，不保存横坐标数组，只为抽取后
+    要绘制的点计算横坐标。
+    """
+    def __init__(self, y, x0=0.0, dx=1.0):
+        """
+        Constructor
+
+        @param y 纵坐标
+        @type numpy.ndarray
+        @param x0 第一个点的横坐标
+        @type float
+        @param dx 相邻两点横坐标的间隔，大于 0
+        @type float
+        """
+        self.y = y
+        self.x0 = x0
+        self.dx = dx
+        self.levels = []
+        bin_size = step = BASE_BIN
+        mins = maxs = y
+        while len(y) // bin_size >= MIN_LEVEL_BINS:
+            # 每一层由上一层的区间合并而来，整个金字塔只需扫描一遍原始数据。
+            mins = _reduce(mins, step, np.minimum)
+            maxs = _reduce(maxs, step, np.maximum)
+            self.levels.append((bin_size, mins, maxs))
+            bin_size *= LEVEL_FACTOR
+            step = LEVEL_FACTOR
+
+    def x(self, indices):
+        """
+        计算各点的横坐标。
+
+        @param indices 点的序号
+        @type numpy.ndarray
+        @return 横坐标
+        @rtype numpy.ndarray
+        """
+        return self.x0 + indices * self.dx
+
+    def decimate(self, xmin, xmax, width):
+        """
+        返回可见范围 [xmin, xmax] 内约 width 列的最小/最大值折线。
+
+        @param xmin 可见范围下限
+        @type float
+        @param xmax 可见范围上限
+        @type float
+        @param width 绘图区宽度（像素）
+        @type int
+        @return 用于绘制的横、纵坐标
+        @rtype tuple of (numpy.ndarray, numpy.ndarray)
+        """
+        # 多取一个点，使折线延伸到可见范围边缘之外。
+        N = len(self.y)
+        start = min(max(int(np.floor((xmin - self.x0) / self.dx)), 0), N)
+        stop = min(max(int(np.ceil((xmax - self.x0) / self.dx)) + 1, start),
+                   N)
+        width = max(int(width), 1)
+        if stop - start <= 2 * width:
+            return self.x(np.arange(start, stop)), self.y[start:stop]
+
+        # 选择区间数不少于 width 的最粗一层。
+        bin_size, mins, maxs = 1, self.y, self.y
+        for level in self.levels:
+            if (stop - start) // level[0] < width:
+                break
+            bin_size, mins, maxs = level
+        first = start // bin_size
+        last = -(-stop // bin_size)
+        mins = mins[first:last]
+        maxs = maxs[first:last]
+
+        # 把该层的区间合并为 width 列。
+        edges = np.linspace(0, len(mins), width + 1).astype(np.intp)[:-1]
+        edges = np.unique(edges)
+        col_min = np.minimum.reduceat(mins, edges)
+        col_max = np.maximum.reduceat(maxs, edges)
+        col_x = self.x(np.minimum((first + edges) * bin_size, N - 1))
+
+        x = np.repeat(col_x, 2)
+        y = np.empty(2 * len(edges), dtype=col_min.dtype)
+        y[0::2] = col_min
+        y[1::2] = col_max
+        return x, y
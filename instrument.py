@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing per-stage timing and memory instrumentation.
+
+一次采集（或导出）记为一个 Trace，其中每个阶段记录耗时、每秒处理的采样点数
+与阶段内新分配的字节数。Trace 结束时以一行 JSON 追加到轮转的记录文件中，
+供离线分析。
+
+关闭时 tracer.trace 返回共享的 NULL_TRACE，其 stage 返回共享的空上下文，
+不计时、不创建对象，也不启动 tracemalloc。
+
+分配的字节数取自 tracemalloc：阶段开始时把峰值重置为当前值，结束时峰值与
+开始时的差即为阶段内的最大新增分配。tracemalloc 是全进程的，界面线程与后台
+线程同时运行的阶段会互相计入，数值只作参考。开启 tracemalloc 本身会使分配
+变慢，只在开启诊断时启动。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from logging.handlers import RotatingFileHandler
+
+# 记录文件的位置、单个文件的字节数上限与保留的旧文件个数。
+TRACE_FILE = os.path.join(os.path.expanduser("~"), ".mcs", "trace.jsonl")
+TRACE_BYTES = 1 << 20
+TRACE_BACKUPS = 3
+
+
+
+class Stage(object):
+    """
+    一个阶段的计时与内存记录，作为上下文管理器使用。采样点数在阶段内才
+    知道时，可以在退出之前赋给 samples。
+    """
+    def __init__(self, trace, name, samples):
+        self.trace = trace
+        self.name = name
+        self.samples = samples
+
+    def __enter__(self):
+        self.current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        _, peak = tracemalloc.get_traced_memory()
+        self.trace.add(self.name, seconds, self.samples,
+                       max(peak - self.current, 0))
+        return False
+
+
+class NullStage(object):
+    """
+    关闭诊断时共用的空阶段。采样点数在阶段内才知道时可以赋给 samples，
+    赋值被忽略。
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def samples(self):
+        return 0
+
+    @samples.setter
+    def samples(self, value):
+        pass
+
+
+_NULL_STAGE = NullStage()
+
+
+class Trace(object):
+    """一次采集或导出的各阶段记录。可以在多个线程中依次添加阶段。"""
+    def __init__(self, tracer, kind, info):
+        """
+        Constructor
+
+        @param tracer 所属的 Tracer
+        @type Tracer
+        @param kind 类型，如 "acquire"、"export"
+        @type str
+        @param info 附加信息，如采样频率、文件名
+        @type dict
+        """
+        self.tracer = tracer
+        self.kind = kind
+        self.info = info
+        self.stages = []
+        self.time = time.time()
+        self.lock = threading.Lock()
+
+    def stage(self, name, samples=0):
+        """
+        返回记录一个阶段的上下文管理器。
+
+        @param name 阶段名称
+        @type str
+        @param samples 阶段处理的采样点数，用于计算每秒处理的点数
+        @type int
+        @return 上下文管理器
+        @rtype Stage
+        """
+        return Stage(self, name, samples)
+
+    def add(self, name, seconds, samples, allocated):
+        """添加一个阶段的记录。"""
+        with self.lock:
+            self.stages.append({
+                "stage": name, "seconds": seconds, "samples": samples,
+                "samples_per_s": samples / seconds if seconds else None,
+                "bytes": allocated})
+
+    def finish(self):
+        """结束记录并写入记录文件。"""
+        self.tracer.write(self)
+
+    def summary(self):
+        """
+        状态栏中显示的摘要：各阶段耗时、合计耗时、第一个阶段的点数按合计
+        耗时计算的每秒处理点数与各阶段中最大的分配。
+
+        @return 摘要
+        @rtype str
+        """
+        if not self.stages:
+            return ""
+        parts = [f"{s['stage']} {s['seconds'] * 1000:.0f} ms"
+                 for s in self.stages]
+        seconds = sum(s["seconds"] for s in self.stages)
+        samples = self.stages[0]["samples"]
+        parts.append(f"合计 {seconds * 1000:.0f} ms")
+        if samples and seconds:
+            parts.append(f"{samples / seconds:.3g} 点/s")
+        allocated = max(s["bytes"] for s in self.stages)
+        parts.append(f"分配 {allocated / (1 << 20):.1f} MB")
+        return "  ".join(parts)
+
+    def details(self):
+        """各阶段的完整记录，每行一个阶段。"""
+        return "\n".join(
+            f"{s['stage']}: {s['seconds'] * 1000:.1f} ms, "
+            f"{s['samples']} 点"
+            + (f", {s['samples_per_s']:.3g} 点/s" if s["samples_per_s"]
+               else "")
+            + f", 分配 {s['bytes'] / (1 << 20):.2f} MB"
+            for s in self.stages)
+
+    def to_dict(self):
+        """写入记录文件的内容。"""
+        return {"kind": self.kind, "time": self.time, "info": self.info,
+                "stages": self.stages}
+
+
+class NullTrace(object):
+    """关闭诊断时使用的空记录，所有操作都不做任何事。"""
+    stages = ()
+
+    def stage(self, name, samples=0):
+        return _NULL_STAGE
+
+    def add(self, name, seconds, samples, allocated):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class Tracer(object):
+    """诊断开关与轮转的记录文件。"""
+    def __init__(self):
+        self.enabled = False
+        self.logger = None
+
+    def enable(self, file_name=TRACE_FILE):
+        """
+        开启诊断。
+
+        @param file_name 记录文件路径
+        @type str
+        """
+        if self.enabled:
+            return
+        if self.logger is None:
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+            handler = RotatingFileHandler(file_name, maxBytes=TRACE_BYTES,
+                                          backupCount=TRACE_BACKUPS,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger = logging.getLogger("mcs.trace")
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+            self.logger.addHandler(handler)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        """关闭诊断。"""
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+
+    def trace(self, kind, **info):
+        """
+        开始一次记录；关闭诊断时返回 NULL_TRACE。
+
+        @param kind 类型，如 "acquire"、"export"
+        @type str
+        @param info 附加信息
+        @type dict
+        @return 记录
+        @rtype Trace or NullTrace
+        """
+        if not self.enabled:
+            return NULL_TRACE
+        return Trace(self, kind, info)
+
+    def write(self, trace):
+        """把一次记录以一行 JSON 追加到记录文件。"""
+        if self.logger is not None:
+            self.logger.info(json.dumps(trace.to_dict(), ensure_ascii=False))
+
+
+tracer = Tracer()
@@ -5,24 +5,40 @@ Module implementing MCS.
 """
 
 import sys
-
-import numpy as np
-
-from scipy.fft import fft, fftfreq
-from scipy import signal
-from PyQt5.QtCore import pyqtSlot, QRegExp
-from PyQt5.QtWidgets import (QMainWindow, QApplication, QSizePolicy,
-                             QActionGroup, QDialog, QFileDialog, QMessageBox,
-                             QColorDialog)
-from PyQt5.QtGui import QRegExpValidator, QIntValidator
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import (NavigationToolbar2QT
-                                                as NavigationToolbar)
-from matplotlib.figure import Figure
-
-from Ui_mcs import Ui_MCS
-from Ui_data import Ui_Dialog
-from signal_dlg import Signal
+import time
+
+# 启动计时的起点，在导入其他模块之前记录。
+STARTUP_START = time.perf_counter()
+
+import numpy as np  # noqa: E402
+
+from PyQt5.QtCore import pyqtSlot, QRegExp, QTimer  # noqa: E402
+from PyQt5.QtWidgets import (  # noqa: E402
+    QMainWindow, QApplication, QActionGroup, QFileDialog, QMessageBox,
+    QColorDialog, QProgressBar, QPushButton, QLabel, QAction, QInputDialog)
+from PyQt5.QtGui import QRegExpValidator, QIntValidator  # noqa: E402
+
+from Ui_mcs import Ui_MCS  # noqa: E402
+from signal_dlg import Signal  # noqa: E402
+from spectrum_dlg import SpectrumDialog  # noqa: E402
+from data_dlg import SampleDataDialog  # noqa: E402
+import averaging  # noqa: E402
+import export  # noqa: E402
+import instrument  # noqa: E402
+import synthesis  # noqa: E402
+from acquisition import Acquisition, load_file  # noqa: E402
+from worker import (  # noqa: E402
+    ComputeThread, ExportThread, PreloadThread, SpectrogramThread,
+    SpectrumThread)
+from continuous import ContinuousAcquisition  # noqa: E402
+from spectrogram import Spectrogram  # noqa: E402
+
+# 采样波形缩放或拖动停止多久之后重新计算可见范围的 FFT（ms）。
+LOCAL_SPECTRUM_DELAY = 150
+
+# 实时预览时参数停止变化多久之后重新计算（ms），以及预览的最大点数。
+LIVE_PREVIEW_DELAY = 200
+PREVIEW_POINTS = 1 << 16
 
 
 class MCS(QMainWindow, Ui_MCS):
@@ -40,25 +56,13 @@ class MCS(QMainWindow, Ui_MCS):
         super(MCS, self).__init__(parent)
         self.setupUi(self)
 
-        # 添加 matplotlib 画布组件用于绘图
-        self.canvas1 = Canvas(self.frame,
-                              xlabel="Time(s)", title="Sampled waveform")
-        self.canvas1.get_default_filename = lambda: 'Sampled waveform.png'
-
-        self.horizontalLayout_15.addWidget(self.canvas1)
-
-        self.canvas2 = Canvas(self.frame,
-                              xlabel="Frequency(Hz)",
-                              title="FFT of Sampled waveform")
-        self.canvas2.get_default_filename = lambda: ('FFT of Sampled '
-                                                     'waveform.png')
-        self.horizontalLayout_14.addWidget(self.canvas2)
-
-        # 添加 matplotlib 导航工具栏用于操作图像。
-        self.toolbar1 = NavigationToolbar(self.canvas1, self)
-        self.toolbar1.hide()
-        self.toolbar2 = NavigationToolbar(self.canvas2, self)
-        self.toolbar2.hide()
+        # matplotlib 画布在窗口首次绘制之后才创建，见 on_first_paint。
+        self.canvas1 = self.canvas2 = self.canvas3 = None
+        self.toolbar1 = self.toolbar2 = self.toolbar3 = None
+        self.painted = False
+        # 启动计时模式下为 [(阶段, 距启动的时间)]，否则为 None。
+        self.startup_times = None
+        self.preload = None
 
         # 为文本框添加 validator
         regex = QRegExp(r'^400(\.0)?$|^[1-3]?[0-9]{1,2}(\.[0-9])?$')
@@ -70,13 +74,89 @@ class MCS(QMainWindow, Ui_MCS):
         self.scrollbar_value = 1
         self.signal_wave = None
         self.amplitude = 2.5, 2.5
-        self.data = None
+        self.acquisition = None
+        # 最近一次显示的计算结果，以及图标题的后缀（预览、平均方式）。
+        self.result = None
+        self.result_suffix = ""
+        self.data_file = None
         self.external_flag = False
         self.sample_freq_value = 0.1
         self.axes_color = "w"
         self.figure_color = None
         self.line_color = "C0"
         self.sample_time = 5
+        self.worker = None
+        self.workers = []
+        # 采样值的数据类型，float32 时内存减半。
+        self.dtype = np.float64
+
+        # 计算在后台线程中进行，状态栏中的进度条显示进度。
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setRange(0, 100)
+        self.progressBar.setMaximumWidth(200)
+        self.progressBar.hide()
+        self.statusBar().addPermanentWidget(self.progressBar)
+
+        # 缩放或拖动采样波形后，FFT 只对可见范围重新计算。事件停止
+        # LOCAL_SPECTRUM_DELAY 毫秒后才计算，同时只有一个线程在计算，期间的
+        # 请求合并为结束后的一次。
+        self.spectrum_timer = QTimer(self)
+        self.spectrum_timer.setSingleShot(True)
+        self.spectrum_timer.setInterval(LOCAL_SPECTRUM_DELAY)
+        self.spectrum_timer.timeout.connect(self.update_local_spectrum)
+        self.spectrum_worker = None
+        self.spectrum_pending = False
+        # 整段记录的频谱金字塔，缩放回整个范围时直接使用。
+        self.full_spectrum = None
+
+        # 实时预览：参数改变后重启 live_timer，停止变化 LIVE_PREVIEW_DELAY
+        # 毫秒后才计算。先计算并显示点数不超过 PREVIEW_POINTS 的预览，完成
+        # 后再计算完整的采集，live_pending 为等待计算的 (source, trace)。
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_PREVIEW_DELAY)
+        self.live_timer.timeout.connect(self.update_live)
+        self.live_pending = None
+
+        # 多次平均：开启时每次采集重复 K 次并原地累加，见 averaging 模块。
+        self.averager = averaging.Averager()
+        self.average_mode = None
+
+        # 勾选 View-Spectrogram 时当前的采集还没有时频图，只在后台计算时频图。
+        self.spectrogram_workers = []
+
+        # 导出同样在后台线程中进行，有单独的进度条与取消按钮。
+        self.exporter = None
+        self.exportProgressBar = QProgressBar(self)
+        self.exportProgressBar.setRange(0, 100)
+        self.exportProgressBar.setMaximumWidth(200)
+        self.exportProgressBar.setFormat("导出 %p%")
+        self.exportProgressBar.hide()
+        self.statusBar().addPermanentWidget(self.exportProgressBar)
+        self.pushButton_cancel = QPushButton("取消导出", self)
+        self.pushButton_cancel.setObjectName("pushButton_cancel")
+        self.pushButton_cancel.hide()
+        self.statusBar().addPermanentWidget(self.pushButton_cancel)
+        self.pushButton_cancel.clicked.connect(self.cancel_export)
+
+        # 连续采样按钮，以及状态栏中的帧时间与丢弃数据块计数。
+        self.continuous = None
+        self.pushButton_run = QPushButton("连续采样", self.groupBox_7)
+        self.pushButton_run.setObjectName("pushButton_run")
+        self.pushButton_run.setCheckable(True)
+        self.gridLayout_4.addWidget(self.pushButton_run, 0, 1, 1, 1)
+        self.pushButton_run.toggled.connect(self.on_pushButton_run_toggled)
+        self.runStatsLabel = QLabel(self)
+        self.runStatsLabel.hide()
+        self.statusBar().addPermanentWidget(self.runStatsLabel)
+        # 开启诊断时，状态栏中显示最近一次采集或导出的各阶段耗时与内存。
+        self.diagnosticsLabel = QLabel(self)
+        self.diagnosticsLabel.hide()
+        self.statusBar().addPermanentWidget(self.diagnosticsLabel)
+        # 多次平均时显示平均次数、信噪比及其提高与每次平均的耗时。
+        self.averageLabel = QLabel(self)
+        self.averageLabel.hide()
+        self.statusBar().addPermanentWidget(self.averageLabel)
 
         # 将菜单栏中的 signal 选项改为单选。
         self.menuGroupSingal = QActionGroup(self.menuSignal)
@@ -85,113 +165,605 @@ class MCS(QMainWindow, Ui_MCS):
         self.menuGroupSingal.addAction(self.actionSin)
         self.menuGroupSingal.setExclusive(True)
 
+        # 在 View 菜单中添加频谱设置。
+        self.actionSpectrum_Setting = QAction("Spectrum Setting", self)
+        self.actionSpectrum_Setting.setObjectName("actionSpectrum_Setting")
+        self.menu_2.addAction(self.actionSpectrum_Setting)
+        self.actionSpectrum_Setting.triggered.connect(
+            self.on_actionSpectrum_Setting_triggered)
+
+        # 在 View 菜单中添加单精度选项。
+        self.actionSingle_Precision = QAction("Single Precision (float32)",
+                                              self)
+        self.actionSingle_Precision.setObjectName("actionSingle_Precision")
+        self.actionSingle_Precision.setCheckable(True)
+        self.menu_2.addAction(self.actionSingle_Precision)
+        self.actionSingle_Precision.toggled.connect(
+            self.on_actionSingle_Precision_toggled)
+
+        # 在 View 菜单中添加时频图选项，勾选时下方的画布显示时频图。
+        self.actionSpectrogram = QAction("Spectrogram", self)
+        self.actionSpectrogram.setObjectName("actionSpectrogram")
+        self.actionSpectrogram.setCheckable(True)
+        self.menu_2.addAction(self.actionSpectrogram)
+        self.actionSpectrogram.toggled.connect(
+            self.on_actionSpectrogram_toggled)
+
+        # 在 View 菜单中添加实时预览选项，勾选时改变参数即重新采集。
+        self.actionLive_Preview = QAction("Live Preview", self)
+        self.actionLive_Preview.setObjectName("actionLive_Preview")
+        self.actionLive_Preview.setCheckable(True)
+        self.menu_2.addAction(self.actionLive_Preview)
+        self.actionLive_Preview.toggled.connect(
+            self.on_actionLive_Preview_toggled)
+
+        # 在 View 菜单中添加多次平均的子菜单：平均方式单选，以及平均次数。
+        self.menuAveraging = self.menu_2.addMenu("Averaging")
+        self.menuAveraging.setObjectName("menuAveraging")
+        self.menuGroupAveraging = QActionGroup(self.menuAveraging)
+        self.menuGroupAveraging.setExclusive(True)
+        for name, mode in (("Off", None),
+                           ("Linear", averaging.LINEAR),
+                           ("Exponential", averaging.EXPONENTIAL),
+                           ("Peak Hold", averaging.PEAK_HOLD)):
+            action = QAction(name, self)
+            action.setCheckable(True)
+            action.setChecked(mode is None)
+            action.setData(mode)
+            self.menuGroupAveraging.addAction(action)
+            self.menuAveraging.addAction(action)
+        self.menuGroupAveraging.triggered.connect(
+            self.on_menuGroupAveraging_triggered)
+        self.menuAveraging.addSeparator()
+        self.actionAverage_Count = QAction("Average Count...", self)
+        self.actionAverage_Count.setObjectName("actionAverage_Count")
+        self.menuAveraging.addAction(self.actionAverage_Count)
+        self.actionAverage_Count.triggered.connect(
+            self.on_actionAverage_Count_triggered)
+
+        # 在 View 菜单中添加性能诊断选项。
+        self.actionDiagnostics = QAction("Diagnostics", self)
+        self.actionDiagnostics.setObjectName("actionDiagnostics")
+        self.actionDiagnostics.setCheckable(True)
+        self.actionDiagnostics.setStatusTip(
+            f"记录各阶段的耗时与内存，写入 {instrument.TRACE_FILE}")
+        self.menu_2.addAction(self.actionDiagnostics)
+        self.actionDiagnostics.toggled.connect(
+            self.on_actionDiagnostics_toggled)
+
+    def paintEvent(self, event):
+        """首次绘制之后再加载 matplotlib 与 SciPy。"""
+        super(MCS, self).paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.mark_startup("首次绘制")
+            QTimer.singleShot(0, self.on_first_paint)
+
+    def on_first_paint(self):
+        """创建 matplotlib 画布，并在后台线程中预先导入 SciPy。"""
+        # 导入 matplotlib 的 Qt 后端较慢，推迟到窗口显示出来之后。
+        from canvas import Canvas, NavigationToolbar, SpectrogramCanvas
+
+        # 添加 matplotlib 画布组件用于绘图
+        self.canvas1 = Canvas(self.frame,
+                              xlabel="Time(s)", title="Sampled waveform")
+        self.canvas1.get_default_filename = lambda: 'Sampled waveform.png'
+
+        self.horizontalLayout_15.addWidget(self.canvas1)
+        self.canvas1.xlimChanged.connect(self.on_canvas1_xlim_changed)
+
+        self.canvas2 = Canvas(self.frame,
+                              xlabel="Frequency(Hz)",
+                              title="FFT of Sampled waveform")
+        self.canvas2.get_default_filename = lambda: ('FFT of Sampled '
+                                                     'waveform.png')
+        self.horizontalLayout_14.addWidget(self.canvas2)
+
+        # 时频图与 FFT 共用下方的区域，由 View-Spectrogram 切换。
+        self.canvas3 = SpectrogramCanvas(self.frame_2,
+                                         title="Spectrogram of Sampled "
+                                               "waveform")
+        self.canvas3.get_default_filename = lambda: ('Spectrogram of '
+                                                     'Sampled waveform.png')
+        self.canvas3.hide()
+        self.horizontalLayout_14.addWidget(self.canvas3)
+
+        # 添加 matplotlib 导航工具栏用于操作图像。
+        self.toolbar1 = NavigationToolbar(self.canvas1, self)
+        self.toolbar1.hide()
+        self.toolbar2 = NavigationToolbar(self.canvas2, self)
+        self.toolbar2.hide()
+        self.toolbar3 = NavigationToolbar(self.canvas3, self)
+        self.toolbar3.hide()
+        self.mark_startup("创建画布")
+
+        self.preload = PreloadThread(self)
+        self.preload.finished.connect(self.on_preload_finished)
+        self.preload.start()
+
+    def on_preload_finished(self):
+        """SciPy 导入完成；启动计时模式下输出各阶段的时间并退出。"""
+        self.mark_startup("导入 SciPy")
+        if self.startup_times is not None:
+            previous = 0.0
+            for stage, elapsed in self.startup_times:
+                print(f"{stage:<10} {elapsed * 1000:8.1f} ms "
+                      f"(+{(elapsed - previous) * 1000:.1f} ms)")
+                previous = elapsed
+            self.close()
+
+    def mark_startup(self, stage):
+        """启动计时模式下记录一个阶段完成的时间。"""
+        if self.startup_times is not None:
+            self.startup_times.append((stage,
+                                       time.perf_counter() - STARTUP_START))
+
     def zoom(self):
         """缩放图像。"""
         self.toolbar1.zoom()
         self.toolbar2.zoom()
+        self.toolbar3.zoom()
 
     def pan(self):
         """拖动图像。"""
         self.toolbar1.pan()
         self.toolbar2.pan()
+        self.toolbar3.pan()
 
     def save(self):
         """保存图像。"""
         self.toolbar1.save_figure()
-        self.toolbar2.save_figure()
-
-    def generate_signal(self, freq, sample_point):
-        """根据传入参数及预设，生成对应信号。"""
-        # 函数的相位
-        phase = 2 * np.pi * freq * sample_point
-
-        # 模拟产生噪音信号
-        noise = np.random.randn(*np.shape(sample_point)) / 50
-        # noise = 0
-
-        if self.signal_wave == 3:
-            # 返回正弦波
-            return self.amplitude[0] * np.sin(phase) + noise + self.amplitude[1]
-        elif self.signal_wave == 2:
-            # 返回三角波
-            return (self.amplitude[0] * signal.sawtooth(phase, 0.5) + noise
-                    + self.amplitude[1])
-        else:
-            # 返回方波
-            return (self.amplitude[0] * signal.square(phase) + noise +
-                    self.amplitude[1])
+        self.lower_toolbar().save_figure()
+
+    def lower_toolbar(self):
+        """下方正在显示的画布（FFT 或时频图）的导航工具栏。"""
+        if self.actionSpectrogram.isChecked():
+            return self.toolbar3
+        return self.toolbar2
 
     def plot(self):
-        """绘制图像。"""
-        # 采样时间
-        T = self.sample_time
+        """
+        开始一次采集（或恢复文件中的数据）。计算在后台线程中进行，完成后由
+        show_result 更新界面；正在进行的计算会被取消。
+        """
+        # 单次采集前先停止连续采样。
+        self.pushButton_run.setChecked(False)
+
+        from_file = self.external_flag
+        average_key = None
         if self.external_flag:
-            x, y, N, f_s = self.resume_data_from_file()
-            self.horizontalScrollBar.setValue(int(N / 10))
             self.external_flag = False
+            data_file = self.data_file
+            dtype = self.dtype
+            trace = instrument.tracer.trace("open", file=data_file,
+                                            dtype=np.dtype(dtype).name)
+
+            def source(progress):
+                return self.resume_data_from_file(data_file, progress, dtype)
         else:
+            # 采样时间
+            T = self.sample_time
+
             # f_s 范围 0.1k~400K 而 scrollbar_value 范围 1~1000
             f_s = int(self.scrollbar_value * 10)
+            trace = instrument.tracer.trace("acquire", f_s=f_s, T=T,
+                                            freq=signal_dlg.freq,
+                                            dtype=np.dtype(self.dtype).name)
+            source = self.synthesis_source(T)
+            average_key = self.average_key(T)
+
+        self.start_worker(source, from_file, trace, average_key)
+
+    def synthesis_source(self, T):
+        """
+        返回生成一次采集的函数，参数在界面线程中取得，后台线程中不访问控件。
+
+        @param T 采样时间（s）
+        @type float
+        @return 返回 Acquisition 的函数，参数为进度回调
+        @rtype callable
+        """
+        # f_s 范围 0.1k~400K 而 scrollbar_value 范围 1~1000
+        f_s = int(self.scrollbar_value * 10)
+
+        # 设置产生信号的频率
+        freq = signal_dlg.freq
+
+        wave, amplitude = self.signal_wave, self.amplitude
+        v_range = self.voltage_range()
+        dtype = self.dtype
 
-            # 采样点数 N = T * f_s
-            N = T * f_s
-
-            # 生成采样点集，范围从 0-T 均分 N个点。
-            x = np.linspace(0, T, N, endpoint=False)
-
-            # 设置产生信号的频率
-            freq = signal_dlg.freq
-
-            # 采样点
-            sample_point = x
-
-            # 生成指定信号
-            y = self.generate_signal(freq, sample_point)
-
-            # 生成用于导出的数据
-            self.generate_export_data(x, y, N, f_s)
-
-        # FFT 变换
-        yf2 = fft(y)
-        f = fftfreq(N, 1.0 / f_s)
-        mask = np.where(f >= 0)
-        xf2 = f[mask]
-        yf2 = abs(yf2[mask] / N)
-
-        self.lineEdit.setText(f"{np.max(y) - np.mean(y):.4f}")
-
-        y_ac = y - np.mean(y)
-        count = ((y_ac[:-1] * y_ac[1:]) < 0).sum()
-        count = count if count % 2 == 0 else count + 1
-        self.lineEdit_3.setText(f"{2*T/count:.4f}")
-        # self.lineEdit_3.setText(f"{((y_ac[:-1] * y_ac[1:]) < 0).sum():.5f}")
-        self.lineEdit_2.setText(f"{count/(2*T):.2f}")
-        self.canvas1.plot(x, y, "Time(s)", "Amplitude(V)", "Sampled waveform",
-                          self.line_color, self.axes_color, self.figure_color)
-        self.canvas2.plot(xf2, yf2, "Frequency(Hz)", "Amplitude(V)",
-                          "FFT of Sampled waveform", self.line_color,
-                          self.axes_color, self.figure_color)
-
-    def generate_export_data(self, x, y, N, f_s):
-        """生成用于输出的数据。"""
-        self.data = f"{N}\n{f_s}\n" + "\n".join([str(i) for i in zip(x, y)])
-
-    def resume_data_from_file(self):
-        """从文件中恢复数据。"""
-        data = self.data.split("\n")
-        list_data = [eval(i) for i in data[2:]]
-        N = int(data[0])
-        f_s = int(data[1])
-        x, y = map(list, zip(*list_data))
-        x = np.array(x)
-        y = np.array(y)
-        return x, y, N, f_s
+        def source(progress):
+            # 生成 T * f_s 个采样点，不含噪声的波形取自缓存。
+            y, spectrum = synthesis.synthesize(wave, freq, amplitude,
+                                               f_s, T, dtype=dtype)
+
+            # 只保存采样值，时间由 t0 与 f_s 计算，导出或查看时再序列化。
+            return Acquisition(y, f_s, 0.0, v_range, spectrum)
+
+        return source
+
+    def schedule_live(self):
+        """
+        实时预览时，参数改变后推迟重新计算；正在进行的计算已经过时，立即
+        取消，不与界面争用处理器。
+        """
+        if not self.actionLive_Preview.isChecked() \
+                or self.continuous is not None:
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+        self.live_pending = None
+        self.live_timer.start()
+
+    def update_live(self):
+        """
+        按当前参数重新采集。点数较多时先以相同的采样频率生成前
+        PREVIEW_POINTS 个点作为预览，频率分辨率较低但测量与波形形状不变；
+        预览显示之后由 show_result 开始完整的计算。
+        """
+        if not self.actionLive_Preview.isChecked() \
+                or self.continuous is not None:
+            return
+        T = self.sample_time
+        f_s = int(self.scrollbar_value * 10)
+        trace = instrument.tracer.trace("acquire", f_s=f_s, T=T,
+                                        freq=signal_dlg.freq, live=True,
+                                        dtype=np.dtype(self.dtype).name)
+        source = self.synthesis_source(T)
+        average_key = self.average_key(T)
+        if T * f_s <= PREVIEW_POINTS and average_key is None:
+            self.start_worker(source, False, trace)
+            return
+        self.start_worker(self.synthesis_source(min(T, PREVIEW_POINTS / f_s)))
+        self.live_pending = source, trace, average_key
+
+    def average_key(self, T):
+        """
+        多次平均时的采集参数，参数改变时重新开始平均。
+
+        @param T 采样时间（s）
+        @type float
+        @return 采集参数，未开启多次平均时为 None
+        @rtype tuple
+        """
+        if self.average_mode is None:
+            return None
+        return (int(self.scrollbar_value * 10), T, self.signal_wave,
+                signal_dlg.freq, self.amplitude, np.dtype(self.dtype).name,
+                vars(spectrum_dlg.settings()))
+
+    def start_worker(self, source, from_file=False,
+                     trace=instrument.NULL_TRACE, average_key=None):
+        """
+        在后台线程中计算，完成后由 show_result 更新界面。
+
+        @param source 返回 Acquisition 的函数，参数为进度回调
+        @type callable
+        @param from_file 数据是否来自文件
+        @type bool
+        @param trace 各阶段的记录，被取消的计算不写入记录文件
+        @type instrument.Trace
+        @param average_key 采集参数，不为 None 时重复采集并平均
+        @type tuple
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+        self.live_pending = None
+        averager = self.averager if average_key is not None else None
+        self.worker = ComputeThread(source, from_file, spectrum_dlg.settings(),
+                                    trace, self.actionSpectrogram.isChecked(),
+                                    averager, average_key, self)
+        self.worker.progressChanged.connect(self.show_progress)
+        self.worker.resultReady.connect(self.show_result)
+        self.worker.failed.connect(self.show_failure)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.workers.append(self.worker)
+        self.progressBar.setValue(0)
+        self.progressBar.show()
+        self.worker.start()
+
+    def show_progress(self, value, text):
+        """显示后台计算的进度。"""
+        if self.sender() is self.worker:
+            self.progressBar.setValue(value)
+            self.statusBar().showMessage(text)
+
+    def show_failure(self, message):
+        """后台计算失败时弹出警告。"""
+        if self.sender() is self.worker:
+            QMessageBox.warning(self, "警告", f"无法读取数据：{message}")
+
+    def on_worker_finished(self):
+        """后台线程结束后将其释放；当前的计算结束时隐藏进度条。"""
+        worker = self.sender()
+        self.workers.remove(worker)
+        worker.deleteLater()
+        if worker is self.worker:
+            self.worker = None
+            self.progressBar.hide()
+            self.statusBar().clearMessage()
+
+    def show_result(self, result):
+        """
+        用后台计算的结果更新界面。
+
+        @param result 计算结果
+        @type AcquisitionResult
+        """
+        if self.sender() is not self.worker:
+            # 已被新的采集取代。
+            return
+        # 实时预览的结果之后还有完整的计算。
+        preview = self.live_pending is not None
+        suffix = " (preview)" if preview else ""
+        stats = result.average
+        if stats is not None:
+            suffix = f" ({stats.mode}, {stats.averages} averages)"
+            self.averageLabel.setText(stats.summary())
+        self.averageLabel.setVisible(stats is not None)
+        acquisition = result.acquisition
+        self.acquisition = acquisition
+        self.result = result
+        self.result_suffix = suffix
+        if data_dlg.isVisible() and not preview:
+            data_dlg.set_acquisition(acquisition)
+        if result.from_file:
+            self.horizontalScrollBar.setValue(int(acquisition.N / 10))
+            # 文件的采样频率显示在滑条上，不触发实时预览。
+            self.live_timer.stop()
+
+        amplitude, period, frequency = result.features
+        self.lineEdit.setText(f"{amplitude:.4f}")
+        self.lineEdit_3.setText(f"{period:.4f}")
+        self.lineEdit_2.setText(f"{frequency:.2f}")
+        self.full_spectrum = result.pyramids[1]
+        self.spectrum_timer.stop()
+        trace = self.worker.trace
+        with trace.stage("绘图", acquisition.N):
+            self.canvas1.plot(result.pyramids[0], "Time(s)",
+                              "Amplitude(V)", "Sampled waveform" + suffix,
+                              self.line_color, self.axes_color,
+                              self.figure_color)
+            self.plot_spectrum(result.pyramids[1],
+                               "FFT of Sampled waveform" + suffix)
+            if result.spectrogram is not None:
+                self.canvas3.plot_spectrogram(
+                    result.spectrogram, "Time(s)", "Frequency(Hz)",
+                    "Spectrogram of Sampled waveform" + suffix,
+                    self.axes_color, self.figure_color)
+        self.show_trace(trace)
+        if preview:
+            source, trace, average_key = self.live_pending
+            self.start_worker(source, False, trace, average_key)
+
+    def start_spectrogram(self, acquisition):
+        """
+        在后台线程中为已有的采集计算时频图，不重新计算频谱、测量与抽取。
+
+        @param acquisition 采样数据
+        @type Acquisition
+        """
+        if any(worker.key is acquisition
+               for worker in self.spectrogram_workers):
+            return
+        settings = spectrum_dlg.settings()
+
+        def compute():
+            return Spectrogram(acquisition.y, acquisition.f_s, acquisition.t0,
+                               settings.nperseg, settings.overlap,
+                               settings.window)
+
+        worker = SpectrogramThread(compute, acquisition, self)
+        worker.resultReady.connect(self.show_spectrogram)
+        worker.finished.connect(self.on_spectrogram_finished)
+        self.spectrogram_workers.append(worker)
+        self.statusBar().showMessage("时频图")
+        worker.start()
+
+    def show_spectrogram(self, spectrogram):
+        """显示后台计算的时频图；计算期间采集数据已更换时丢弃。"""
+        result = self.result
+        if result is None or self.sender().key is not result.acquisition:
+            return
+        result.spectrogram = spectrogram
+        self.canvas3.plot_spectrogram(
+            spectrogram, "Time(s)", "Frequency(Hz)",
+            "Spectrogram of Sampled waveform" + self.result_suffix,
+            self.axes_color, self.figure_color)
+
+    def on_spectrogram_finished(self):
+        """释放计算时频图的线程。"""
+        worker = self.sender()
+        self.spectrogram_workers.remove(worker)
+        worker.deleteLater()
+        if not self.spectrogram_workers and self.worker is None:
+            self.statusBar().clearMessage()
+
+    def show_trace(self, trace):
+        """
+        写入一次记录，并在状态栏中显示摘要，各阶段的详细数据在提示中。
+
+        @param trace 记录，诊断关闭时为 NULL_TRACE
+        @type instrument.Trace
+        """
+        trace.finish()
+        if trace.stages:
+            self.diagnosticsLabel.setText(trace.summary())
+            self.diagnosticsLabel.setToolTip(trace.details())
+
+    def on_canvas1_xlim_changed(self, xmin, xmax):
+        """采样波形的横轴范围改变后，推迟重新计算可见范围的 FFT。"""
+        self.spectrum_timer.start()
+
+    def update_local_spectrum(self):
+        """
+        按采样波形的可见范围更新 FFT：可见范围为整段记录时显示整段的频谱，
+        否则在后台线程中只对可见的采样点计算。
+        """
+        acquisition = self.acquisition
+        if (acquisition is None or self.full_spectrum is None
+                or self.continuous is not None
+                or self.actionSpectrogram.isChecked()):
+            return
+        if self.spectrum_worker is not None:
+            # 正在计算的结果已经过时，结束后再按最新的范围计算一次。
+            self.spectrum_pending = True
+            return
+        xmin, xmax = self.canvas1.axes.get_xlim()
+        start = int(np.floor((xmin - acquisition.t0) * acquisition.f_s))
+        stop = int(np.ceil((xmax - acquisition.t0) * acquisition.f_s)) + 1
+        start = min(max(start, 0), acquisition.N)
+        stop = min(max(stop, start), acquisition.N)
+        if start == 0 and stop == acquisition.N:
+            if self.canvas2.pyramid is not self.full_spectrum:
+                self.plot_spectrum(self.full_spectrum,
+                                   "FFT of Sampled waveform"
+                                   + self.result_suffix)
+            return
+        if stop - start < 2:
+            return
+        self.spectrum_worker = SpectrumThread(acquisition, start, stop,
+                                              spectrum_dlg.settings(), self)
+        self.spectrum_worker.resultReady.connect(self.show_local_spectrum)
+        self.spectrum_worker.finished.connect(self.on_spectrum_finished)
+        self.spectrum_worker.start()
+
+    def show_local_spectrum(self, pyramid):
+        """显示可见范围的 FFT；计算期间采集数据已更换时丢弃。"""
+        worker = self.sender()
+        acquisition = worker.acquisition
+        if acquisition is not self.acquisition:
+            return
+        tmin = acquisition.t0 + worker.start_index / acquisition.f_s
+        tmax = acquisition.t0 + (worker.stop_index - 1) / acquisition.f_s
+        self.plot_spectrum(pyramid, f"FFT of Sampled waveform "
+                                    f"({tmin:.6g}~{tmax:.6g} s)")
+
+    def on_spectrum_finished(self):
+        """释放计算可见范围 FFT 的线程，期间有新的请求时再计算一次。"""
+        self.spectrum_worker.deleteLater()
+        self.spectrum_worker = None
+        if self.spectrum_pending:
+            self.spectrum_pending = False
+            self.update_local_spectrum()
+
+    def plot_spectrum(self, pyramid, title):
+        """在 canvas2 上绘制频谱。"""
+        self.canvas2.plot(pyramid, "Frequency(Hz)", "Amplitude(V)", title,
+                          self.line_color, self.axes_color,
+                          self.figure_color)
+
+    def restyle(self):
+        """
+        把当前的颜色应用到各画布上已有的图像。数据、频谱与测量结果都保留在
+        画布与 self.acquisition 中，不重新生成信号，也不重新计算 FFT。
+        """
+        for canvas in (self.canvas1, self.canvas2, self.canvas3):
+            if canvas is not None:
+                canvas.restyle(self.line_color, self.axes_color,
+                               self.figure_color)
+
+    def voltage_range(self):
+        """返回当前输入电压范围 (下限, 上限)。"""
+        return (self.amplitude[1] - self.amplitude[0],
+                self.amplitude[1] + self.amplitude[0])
+
+    def resume_data_from_file(self, data_file, progress=None,
+                              dtype=np.float64):
+        """
+        从文件中恢复数据。该方法不访问控件，可在后台线程中调用。
+
+        @param data_file 数据文件路径
+        @type str
+        @param progress 读取文本文件时的进度回调，参数为 (已读行数, N)
+        @type callable
+        @param dtype 文本文件中采样值的数据类型；二进制文件保持文件中的类型
+        @type numpy.dtype
+        @return 文件中的数据
+        @rtype Acquisition
+        """
+        return load_file(data_file, progress, dtype)
+
+    def start_continuous(self):
+        """开始连续采样，画面按固定帧率刷新。"""
+        if self.worker is not None:
+            self.worker.cancel()
+        f_s = int(self.scrollbar_value * 10)
+
+        def settings():
+            return self.signal_wave, signal_dlg.freq, self.amplitude
+
+        # 连续采样时不计算时频图，下方显示 FFT。
+        self.actionSpectrogram.setChecked(False)
+        self.continuous = ContinuousAcquisition(f_s, self.sample_time,
+                                                settings, self.dtype, self)
+        self.continuous.frameReady.connect(self.show_frame)
+        for canvas, xlabel, title in (
+                (self.canvas1, "Time(s)", "Sampled waveform"),
+                (self.canvas2, "Frequency(Hz)", "FFT of Sampled waveform")):
+            canvas.pyramid = None
+            canvas.set_decoration(xlabel, "Amplitude(V)", title,
+                                  self.axes_color, self.figure_color)
+            canvas.line.set_color(self.line_color)
+        self.runStatsLabel.show()
+        self.continuous.start()
+
+    def stop_continuous(self):
+        """停止连续采样，并对缓冲区中的数据完成一次完整的计算。"""
+        if self.continuous is None:
+            return
+        self.continuous.stop()
+        acquisition = self.continuous.snapshot(self.voltage_range())
+        self.continuous.deleteLater()
+        self.continuous = None
+        self.runStatsLabel.hide()
+        if acquisition.N:
+            self.start_worker(lambda progress: acquisition)
+
+    def show_frame(self):
+        """连续采样时刷新画面，并显示帧时间与丢弃的数据块数。"""
+        continuous = self.continuous
+        self.canvas1.set_points(continuous.x, continuous.y)
+        self.canvas2.set_points(continuous.xf, continuous.yf)
+        self.runStatsLabel.setText(
+            f"帧时间 {continuous.frame_time * 1000:.1f} ms  "
+            f"丢弃 {continuous.dropped} 块")
+
+    def closeEvent(self, event):
+        """关闭窗口前停止连续采样，取消后台计算与导出并等待其结束。"""
+        self.live_timer.stop()
+        if self.continuous is not None:
+            self.continuous.stop()
+        if self.preload is not None:
+            self.preload.wait()
+        for worker in self.workers:
+            worker.cancel()
+            worker.wait()
+        if self.exporter is not None:
+            self.exporter.cancel()
+            self.exporter.wait()
+        if self.spectrum_worker is not None:
+            self.spectrum_worker.wait()
+        for worker in self.spectrogram_workers:
+            worker.wait()
+        if self.canvas3 is not None:
+            self.canvas3.wait_refine()
+        super(MCS, self).closeEvent(event)
 
     @pyqtSlot()
     def on_pushButton_clicked(self):
         """pushButton 被点击时，绘制图像。"""
         self.plot()
 
+    @pyqtSlot(bool)
+    def on_pushButton_run_toggled(self, checked):
+        """pushButton_run（连续采样）按下时开始连续采样，弹起时停止。"""
+        if checked:
+            self.start_continuous()
+        else:
+            self.stop_continuous()
+
     @pyqtSlot()
     def on_pushButton_2_clicked(self):
         """pushButton2 被点击时，允许缩放图像。"""
@@ -233,21 +805,18 @@ class MCS(QMainWindow, Ui_MCS):
     @pyqtSlot()
     def on_pushButton_8_clicked(self):
         """
-        点击 pushButton_8（还原FFT） 触发FFT波形恢复
+        点击 pushButton_8（还原FFT） 触发FFT（或时频图）波形恢复
         """
-        self.toolbar2.home()
+        self.lower_toolbar().home()
 
     @pyqtSlot()
     def on_pushButton_9_clicked(self):
         """
-        点击 pushButton_9（采样数据），从 self.data 中读取数据，并写入弹出对话框中的
-        文本框；如果 self.data 为空，则向文本框中写入报错信息。
+        点击 pushButton_9（采样数据），在弹出的对话框中以表格显示
+        self.acquisition；表格只格式化滚动到的行，打开的快慢与点数无关。
         """
-        if self.data:
-            dlg_ui.textEdit.setText(self.data)
-        else:
-            dlg_ui.textEdit.setText("请先采集数据或导入数据。")
-        Dialog.show()
+        data_dlg.set_acquisition(self.acquisition)
+        data_dlg.show()
 
     @pyqtSlot()
     def on_pushButton_10_clicked(self):
@@ -256,6 +825,111 @@ class MCS(QMainWindow, Ui_MCS):
         """
         signal_dlg.show()
 
+    @pyqtSlot()
+    def on_actionSpectrum_Setting_triggered(self):
+        """
+        点击 View-Spectrum Setting 弹出频谱设置对话框。
+        """
+        spectrum_dlg.show()
+
+    @pyqtSlot(bool)
+    def on_actionSingle_Precision_toggled(self, checked):
+        """
+        勾选 View-Single Precision 时，之后的采集以 float32 生成、计算与绘制，
+        内存约为 float64 的一半，测量误差见 measurement 模块。
+
+        @param checked 是否勾选
+        @type bool
+        """
+        self.dtype = np.float32 if checked else np.float64
+
+    @pyqtSlot(bool)
+    def on_actionSpectrogram_toggled(self, checked):
+        """
+        勾选 View-Spectrogram 时下方的画布改为显示时频图。最近一次的结果还
+        没有时频图时，只在后台计算时频图，采样波形、频谱（包括平均后的
+        幅度谱）与平均的统计都不变。
+
+        @param checked 是否勾选
+        @type bool
+        """
+        if self.canvas3 is None:
+            return
+        self.canvas2.setVisible(not checked)
+        self.canvas3.setVisible(checked)
+        self.groupBox_2.setTitle("采样波形时频图" if checked else "采样波形FFT")
+        result = self.result
+        if checked and result is not None and result.acquisition.N:
+            if result.spectrogram is None:
+                self.start_spectrogram(result.acquisition)
+            elif self.canvas3.spectrogram is not result.spectrogram:
+                self.canvas3.plot_spectrogram(
+                    result.spectrogram, "Time(s)", "Frequency(Hz)",
+                    "Spectrogram of Sampled waveform" + self.result_suffix,
+                    self.axes_color, self.figure_color)
+        elif not checked:
+            # 显示时频图期间采样波形可能已经缩放。
+            self.spectrum_timer.start()
+
+    @pyqtSlot(bool)
+    def on_actionLive_Preview_toggled(self, checked):
+        """
+        勾选 View-Live Preview 时按当前参数立即采集一次，之后参数改变即
+        重新采集；取消勾选时不再响应参数的改变。
+        """
+        if checked:
+            self.update_live()
+        else:
+            self.live_timer.stop()
+
+    def on_menuGroupAveraging_triggered(self, action):
+        """
+        选择 View-Averaging 中的平均方式，清空已有的累加值。
+
+        @param action 选中的平均方式
+        @type QAction
+        """
+        self.average_mode = action.data()
+        if self.average_mode is not None:
+            self.averager.set_mode(self.average_mode, self.averager.count)
+        else:
+            # 释放累加数组。
+            self.averager = averaging.Averager(count=self.averager.count)
+            self.averageLabel.hide()
+
+    @pyqtSlot()
+    def on_actionAverage_Count_triggered(self):
+        """
+        点击 View-Averaging-Average Count 设置平均次数 K，清空已有的累加值。
+        """
+        count, ok = QInputDialog.getInt(self, "平均次数", "平均次数 K：",
+                                        self.averager.count, 1, 10000)
+        if ok:
+            self.averager.set_mode(self.averager.mode, count)
+
+    @pyqtSlot(bool)
+    def on_actionDiagnostics_toggled(self, checked):
+        """
+        勾选 View-Diagnostics 时记录之后每次采集、打开与导出的各阶段耗时、
+        每秒处理点数与分配的内存，显示在状态栏中并追加到记录文件。
+
+        @param checked 是否勾选
+        @type bool
+        """
+        if not checked:
+            instrument.tracer.disable()
+            self.diagnosticsLabel.hide()
+            return
+        try:
+            instrument.tracer.enable()
+        except OSError as err:
+            QMessageBox.warning(self, "警告", f"无法创建记录文件：{err}")
+            self.actionDiagnostics.setChecked(False)
+            return
+        self.diagnosticsLabel.setText("诊断已开启")
+        self.diagnosticsLabel.setToolTip(instrument.TRACE_FILE)
+        self.diagnosticsLabel.show()
+
     @pyqtSlot()
     def on_action_Exit_triggered(self):
         """
@@ -274,6 +948,7 @@ class MCS(QMainWindow, Ui_MCS):
         # ScrollBar 范围为 1-1000 所以将从其获得的值除以十倍置于 lineEdit_4。
         self.lineEdit_4.setText(str(value / 10))
         self.scrollbar_value = value
+        self.schedule_live()
 
     @pyqtSlot()
     def on_lineEdit_4_editingFinished(self):
@@ -297,6 +972,7 @@ class MCS(QMainWindow, Ui_MCS):
         @type self, bool
         """
         self.signal_wave = 1 if checked else None
+        self.schedule_live()
 
     @pyqtSlot(bool)
     def on_actionTriangle_triggered(self, checked):
@@ -307,6 +983,7 @@ class MCS(QMainWindow, Ui_MCS):
         @type self, bool
         """
         self.signal_wave = 2 if checked else None
+        self.schedule_live()
 
     @pyqtSlot(bool)
     def on_actionSin_triggered(self, checked):
@@ -317,6 +994,7 @@ class MCS(QMainWindow, Ui_MCS):
         @type self, bool
         """
         self.signal_wave = 3 if checked else None
+        self.schedule_live()
 
     # 单选框代码，即选则输入电压。
     @pyqtSlot(bool)
@@ -330,6 +1008,7 @@ class MCS(QMainWindow, Ui_MCS):
         """
         if checked:
             self.amplitude = 2.5, 2.5
+            self.schedule_live()
 
     @pyqtSlot(bool)
     def on_radioButton_2_toggled(self, checked):
@@ -342,6 +1021,7 @@ class MCS(QMainWindow, Ui_MCS):
         """
         if checked:
             self.amplitude = 5, 5
+            self.schedule_live()
 
     @pyqtSlot(bool)
     def on_radioButton_3_toggled(self, checked):
@@ -354,6 +1034,7 @@ class MCS(QMainWindow, Ui_MCS):
         """
         if checked:
             self.amplitude = 5, 0
+            self.schedule_live()
 
     @pyqtSlot(bool)
     def on_radioButton_4_toggled(self, checked):
@@ -366,26 +1047,72 @@ class MCS(QMainWindow, Ui_MCS):
         """
         if checked:
             self.amplitude = 10, 0
+            self.schedule_live()
 
     @pyqtSlot()
     def on_actionExport_Data_triggered(self):
         """
-         点击 File—Export Data，将储存在 self.data中的数据导出到文件。
+         点击 File—Export Data，将采集的数据导出到文件。默认导出为二进制采样文件
+         （*.mcs），也可以选择 CSV、无文件头的二进制、numpy 压缩归档或旧的文本
+         格式。数据在后台线程中分块写出，状态栏中显示进度，可以取消。
         """
-        # todo: 导出到 json
-        if self.data:
-            fileName, _ = QFileDialog.getSaveFileName(self, "Export Data")
-            if fileName:
-                file = open(fileName, 'w')
-                text = self.data
-                file.write(text)
-                file.close()
+        if self.exporter is not None:
+            QMessageBox.warning(self, "警告", "正在导出数据，请等待导出完成"
+                                "或取消导出。")
+            return
+        if self.acquisition:
+            fileName, selected = QFileDialog.getSaveFileName(
+                self, "Export Data", "", export.file_filter())
+            if not fileName:
+                return
+            fmt = export.format_of_filter(selected)
+            suffix = export.FORMATS[fmt][1]
+            if not fileName.endswith(suffix):
+                fileName += suffix
+            trace = instrument.tracer.trace("export", file=fileName,
+                                            format=fmt)
+            self.exporter = ExportThread(self.acquisition, fileName, fmt,
+                                         trace, self)
+            self.exporter.progressChanged.connect(
+                self.exportProgressBar.setValue)
+            self.exporter.exported.connect(self.on_exported)
+            self.exporter.failed.connect(self.on_export_failed)
+            self.exporter.finished.connect(self.on_export_finished)
+            self.exportProgressBar.setValue(0)
+            self.exportProgressBar.show()
+            self.pushButton_cancel.show()
+            self.exporter.start()
         else:
             # 如果没有采集数据，则弹出警告。
             reply = QMessageBox.warning(self, "警告", "请先采集数据！",
                                         QMessageBox.Yes | QMessageBox.No,
                                         QMessageBox.Yes)
 
+    def cancel_export(self):
+        """取消正在进行的导出，写完当前一块后生效。"""
+        if self.exporter is not None:
+            self.exporter.cancel()
+            self.pushButton_cancel.setEnabled(False)
+
+    def on_exported(self, file_name):
+        """导出完成。"""
+        self.statusBar().showMessage(f"已导出到 {file_name}", 5000)
+        self.show_trace(self.exporter.trace)
+
+    def on_export_failed(self, message):
+        """导出失败时弹出警告。"""
+        QMessageBox.warning(self, "警告", f"无法导出数据：{message}")
+
+    def on_export_finished(self):
+        """导出线程结束后将其释放，隐藏进度条与取消按钮。"""
+        if self.exporter.cancelled:
+            self.statusBar().showMessage("导出已取消", 5000)
+        self.exporter.deleteLater()
+        self.exporter = None
+        self.exportProgressBar.hide()
+        self.pushButton_cancel.hide()
+        self.pushButton_cancel.setEnabled(True)
+
     @pyqtSlot()
     def on_actionSave_triggered(self):
         """
@@ -399,37 +1126,45 @@ class MCS(QMainWindow, Ui_MCS):
         Slot documentation goes here.
         """
         # TODO: not implemented yet
-        fileName, _ = QFileDialog.getOpenFileName(self, "Open File")
+        fileName, _ = QFileDialog.getOpenFileName(
+            self, "Open File", "",
+            "MCS Sample File (*.mcs);;Text File (*.txt);;All Files (*)")
         if fileName:
-            file = open(fileName, "r")
-            self.data = file.read()
-            # 抛出错误？
+            # 文件在恢复数据时才读取，二进制与文本格式均不再整体读入内存。
+            self.data_file = fileName
             self.external_flag = True
-            file.close()
 
     @pyqtSlot()
     def on_actionLine_Color_triggered(self):
         """
-        Slot documentation goes here.
+        点击 View-Color Setting-Line Color 选择折线颜色，立即应用到现有的图像。
         """
         color = QColorDialog.getColor()
-        self.line_color = color.name()
+        if color.isValid():
+            self.line_color = color.name()
+            self.restyle()
     
     @pyqtSlot()
     def on_actionFigure_Color_triggered(self):
         """
-        Slot documentation goes here.
+        点击 View-Color Setting-Figure Color 选择图形背景颜色，立即应用到现有的
+        图像。
         """
         color = QColorDialog.getColor()
-        self.figure_color = color.name()
+        if color.isValid():
+            self.figure_color = color.name()
+            self.restyle()
     
     @pyqtSlot()
     def on_actionAxes_Color_triggered(self):
         """
-        Slot documentation goes here.
+        点击 View-Color Setting-Axes Color 选择坐标区背景颜色，立即应用到现有的
+        图像。
         """
         color = QColorDialog.getColor()
-        self.axes_color = color.name()
+        if color.isValid():
+            self.axes_color = color.name()
+            self.restyle()
     
     @pyqtSlot()
     def on_lineEdit_5_editingFinished(self):
@@ -437,7 +1172,10 @@ class MCS(QMainWindow, Ui_MCS):
         Slot documentation goes here.
         """
         if self.lineEdit_5.text():
-            self.sample_time = int(self.lineEdit_5.text())
+            sample_time = int(self.lineEdit_5.text())
+            if sample_time != self.sample_time:
+                self.sample_time = sample_time
+                self.schedule_live()
     
     @pyqtSlot()
     def on_actionabout_some_triggered(self):
@@ -459,48 +1197,23 @@ class MCS(QMainWindow, Ui_MCS):
                                     QMessageBox.Yes | QMessageBox.No,
                                     QMessageBox.Yes)
 
-class Canvas(FigureCanvas):
-    def __init__(self, parent=None, width=5, height=4, dpi=100,
-                 xlabel="Time(s)", title="Sampled waveform"):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        fig.set_tight_layout(True)
-        self.axes = fig.add_subplot(111)
-        self.axes.set_ylabel("Amplitude(V)")
-        self.axes.set_xlabel(xlabel)
-        self.axes.set_title(title)
-
-        FigureCanvas.__init__(self, fig)
-        self.setParent(parent)
-
-        FigureCanvas.setSizePolicy(self,
-                                   QSizePolicy.Expanding,
-                                   QSizePolicy.Expanding)
-        FigureCanvas.updateGeometry(self)
-
-    def compute_initial_figure(self):
-        pass
-
-    def plot(self, x, y, xlabel, ylabel, title, color, face_color, fig_color):
-        self.axes.clear()
-        self.axes.set_xlabel(xlabel)
-        self.axes.set_ylabel(ylabel)
-        self.axes.set_title(title)
-        self.axes.set_facecolor(face_color)
-        if fig_color:
-            self.figure.set_facecolor(fig_color)
-        self.axes.plot(x, y, color)
-        self.draw()
-
 
 if __name__ == "__main__":
+    imported = time.perf_counter() - STARTUP_START
     app = QApplication(sys.argv)
     # 启动主窗口
     mainWindow = MCS()
+    if "--startup-time" in sys.argv:
+        # 启动计时模式：输出导入、首次绘制等阶段的时间后退出。
+        mainWindow.startup_times = [("导入模块", imported)]
+        mainWindow.mark_startup("创建主窗口")
+    if "--trace" in sys.argv:
+        mainWindow.actionDiagnostics.setChecked(True)
     mainWindow.show()
     # 加载数据窗口
-    Dialog = QDialog()
-    dlg_ui = Ui_Dialog()
-    dlg_ui.setupUi(Dialog)
+    data_dlg = SampleDataDialog()
     # 加载波形频率窗口
     signal_dlg = Signal()
+    # 加载频谱设置窗口
+    spectrum_dlg = SpectrumDialog()
     sys.exit(app.exec_())
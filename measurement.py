@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing measurement of signal features.
+
+StreamingMeasurement 逐块扫描一遍采样值，同时得到最大值、最小值、均值、
+RMS 与过零次数，每块只产生块大小的临时数组，内存占用与记录长度无关，可以
+直接处理内存映射的文件或任意的数据块序列。
+
+过零以参考电平为界：判断两个相邻采样点是否位于参考电平的两侧，上一块的
+最后一个点留到下一块继续判断。单次扫描时全局均值要到最后才知道，参考电平
+默认取第一块的均值；记录不超过一块（MEASURE_CHUNK 个点）时它就是全局均值，
+与原来先求均值再数过零的结果完全相同。
+
+spectral_peak 由已经得到的频谱估计频率：取最大的频点，再用相邻频点的幅值
+做频点间插值，分辨率远高于频点间隔，也不受噪声引起的多余过零影响。
+
+float32 采样值的统计量均按 float64 累加，测量结果与 float64 采样值的差别在
+以下范围内（界面显示的位数不受影响）：
+
+* 最大幅值：绝对误差不超过 |y| 的最大值 × 2 ** -23，10 V 量程下约 1.2 μV。
+* 周期与频率：只有与均值相差不到一个 float32 舍入间隔（5 V 附近约 0.5 μV）
+  的采样点可能改变过零判断，正常的噪声水平下极少出现；每出现一次，过零
+  次数最多变化 2，频率的相对误差不超过 2 / 过零次数。
+
+benchmarks/bench_precision.py 给出两种精度的峰值内存与实测误差。
+"""
+
+import numpy as np
+
+# 逐块测量时每块的点数。
+MEASURE_CHUNK = 1 << 20
+
+
+class StreamingMeasurement(object):
+    """
+    逐块累加的信号测量：最大值、最小值、均值、RMS 与过零次数。
+    """
+    def __init__(self, reference=None):
+        """
+        Constructor
+
+        @param reference 判断过零的参考电平（V），默认取第一块的均值
+        @type float
+        """
+        self.reference = reference
+        self.N = 0
+        self.maximum = -np.inf
+        self.minimum = np.inf
+        # 相对参考电平的一次与二次累加和，减小大直流偏置下的舍入误差。
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.crossings = 0
+        # 上一块最后一个点相对参考电平的符号。
+        self.last_sign = 0.0
+
+    def update(self, chunk):
+        """
+        累加一块采样值。
+
+        @param chunk 采样值
+        @type numpy.ndarray
+        """
+        if len(chunk) == 0:
+            return
+        if self.reference is None:
+            self.reference = float(np.mean(chunk, dtype=np.float64))
+        self.N += len(chunk)
+        self.maximum = max(self.maximum, float(np.max(chunk)))
+        self.minimum = min(self.minimum, float(np.min(chunk)))
+
+        d = np.subtract(chunk, self.reference, dtype=np.float64)
+        self.sum += float(np.sum(d))
+        self.sum_squares += float(np.dot(d, d))
+
+        # 相邻两点符号相反即为一次过零，恰好等于参考电平的点不算。
+        sign = np.sign(d, out=d)
+        if self.last_sign * sign[0] < 0:
+            self.crossings += 1
+        product = np.multiply(sign[:-1], sign[1:], out=sign[:-1])
+        self.crossings += int(np.count_nonzero(product < 0))
+        self.last_sign = float(sign[-1])
+
+    @property
+    def mean(self):
+        """均值（V）。"""
+        return self.reference + self.sum / self.N if self.N else 0.0
+
+    @property
+    def rms(self):
+        """包含直流分量的均方根值（V）。"""
+        if not self.N:
+            return 0.0
+        total = (self.sum_squares + 2 * self.reference * self.sum
+                 + self.N * self.reference ** 2)
+        return float(np.sqrt(max(total, 0.0) / self.N))
+
+    def features(self, T):
+        """
+        最大幅值、周期与频率。周期与频率由过零次数估计。
+
+        @param T 采样时间（s）
+        @type float
+        @return 最大幅值（V）、周期（s）与频率（Hz）
+        @rtype tuple of float
+        """
+        count = self.crossings
+        count = count if count % 2 == 0 else count + 1
+        period = 2 * T / count if count else np.inf
+        return self.maximum - self.mean, period, count / (2 * T)
+
+
+def measure_chunks(chunks, T, reference=None):
+    """
+    对数据块序列做一次扫描，测量最大幅值、周期与频率。
+
+    @param chunks 依次给出采样值的数据块
+    @type iterable of numpy.ndarray
+    @param T 采样时间（s）
+    @type float
+    @param reference 判断过零的参考电平（V），默认取第一块的均值
+    @type float
+    @return 最大幅值（V）、周期（s）与频率（Hz）
+    @rtype tuple of float
+    """
+    measurement = StreamingMeasurement(reference)
+    for chunk in chunks:
+        measurement.update(chunk)
+    return measurement.features(T)
+
+
+def measure(y, T, chunk=MEASURE_CHUNK):
+    """
+    测量信号的最大幅值、周期与频率。周期与频率由过零次数估计。
+
+    @param y 采样值，可以是内存映射数组
+    @type numpy.ndarray
+    @param T 采样时间（s）
+    @type float
+    @param chunk 每块的点数
+    @type int
+    @return 最大幅值（V）、周期（s）与频率（Hz）
+    @rtype tuple of float
+    """
+    return measure_chunks((y[start:start + chunk]
+                           for start in range(0, len(y), chunk)), T)
+
+
+def spectral_peak(xf, yf, window="boxcar"):
+    """
+    由单边幅度谱中最大的频点估计信号频率（不含直流频点）。
+
+    @param xf 频率，等间隔
+    @type numpy.ndarray
+    @param yf 幅值
+    @type numpy.ndarray
+    @param window 计算频谱时使用的窗函数名称
+    @type str
+    @return 频率（Hz），频谱点数不足时为 0
+    @rtype float
+    """
+    if len(yf) < 2:
+        return 0.0
+    return interpolate_peak(xf, yf, int(np.argmax(yf[1:])) + 1, window)
+
+
+def interpolate_peak(xf, yf, k, window="boxcar"):
+    """
+    用第 k 个频点及其相邻频点的幅值估计峰值所在的频率。
+
+    插值公式按窗函数选择：矩形窗用 Rife 的两点公式，Hann 窗用对应的幅值比
+    公式，两者对单一正弦都是精确的；其他窗对对数幅值做抛物线插值。
+
+    @param xf 频率，等间隔
+    @type numpy.ndarray
+    @param yf 幅值
+    @type numpy.ndarray
+    @param k 峰值频点的序号，不小于 1
+    @type int
+    @param window 计算频谱时使用的窗函数名称
+    @type str
+    @return 频率（Hz）
+    @rtype float
+    """
+    df = float(xf[1] - xf[0])
+    b = float(yf[k])
+    # 直流频点含有偏置，不参与插值。
+    a = float(yf[k - 1]) if k > 1 else 0.0
+    c = float(yf[k + 1]) if k + 1 < len(yf) else 0.0
+    if b <= 0:
+        return float(xf[k])
+
+    side = 1 if c >= a else -1
+    neighbour = c if side > 0 else a
+    if window == "boxcar":
+        delta = neighbour / (b + neighbour)
+    elif window == "hann":
+        ratio = neighbour / b
+        delta = max((2 * ratio - 1) / (ratio + 1), 0.0)
+    else:
+        la, lb, lc = np.log(np.maximum([a, b, c], np.finfo(float).tiny))
+        denominator = la - 2 * lb + lc
+        delta = 0.5 * (la - lc) / denominator if denominator else 0.0
+        side = 1
+    return float(xf[k]) + side * delta * df
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing the MCS binary sample file format.
+
+文件结构：固定 64 字节的文件头，随后紧跟原始采样数据块。
+
+    偏移  长度  内容
+    0     8     魔数 b"MCSDATA\\0"
+    8     2     格式版本（uint16）
+    10    2     文件头长度，即数据块起始偏移（uint16）
+    12    8     采样数据的 numpy dtype 字符串，如 "<f8"
+    20    8     采样点数 N（uint64）
+    28    8     采样频率 f_s，单位 Hz（float64）
+    36    8     起始时间 t0，单位 s（float64）
+    44    8     输入电压范围下限，单位 V（float64）
+    52    8     输入电压范围上限，单位 V（float64）
+    60    4     保留，填零
+
+第 k 个采样点的时间为 t0 + k / f_s，因此文件中不保存时间轴。
+
+旧的文本格式：第一行为 N，第二行为 f_s，其后每行一个 "(x, y)" 元组。
+"""
+
+import os
+import struct
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+
+import numpy as np
+
+MAGIC = b"MCSDATA\0"
+VERSION = 1
+HEADER_SIZE = 64
+SUFFIX = ".mcs"
+
+# 写二进制数据时每块的点数。
+WRITE_CHUNK = 1 << 20
+
+# 解析文本格式时每次读入的行数，决定了解析过程的峰值内存。
+TEXT_CHUNK_ROWS = 1 << 18
+
+_HEADER = struct.Struct("<8sHH8sQdddd")
+
+# 文件头中允许的采样数据类型。
+DTYPES = ("<f4", "<f8")
+
+# 文本中除数字外的字符，numpy 2 的 str() 还会带上 "np.float64"。
+_TEXT_DELETE = str.maketrans("(),", "   ")
+
+SampleHeader = namedtuple("SampleHeader",
+                          ["version", "dtype", "N", "f_s", "t0",
+                           "v_min", "v_max"])
+
+
+class SampleFileError(ValueError):
+    """采样文件格式错误。"""
+
+
+def is_sample_file(file_name):
+    """
+    判断文件是否为 MCS 二进制采样文件。
+
+    @param file_name 文件路径
+    @type str
+    @return 文件以魔数开头时返回 True
+    @rtype bool
+    """
+    with open(file_name, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def backing_file(y):
+    """
+    采样值为内存映射数组（或其视图）时，返回映射的文件路径。
+
+    @param y 采样值
+    @type numpy.ndarray
+    @return 文件路径，不是内存映射时为 None
+    @rtype str
+    """
+    while isinstance(y, np.ndarray):
+        if isinstance(y, np.memmap) and y.filename:
+            return y.filename
+        y = y.base
+    return None
+
+
+def check_destination(file_name, y):
+    """
+    检查写出的目标不是 y 正在映射的文件。覆盖该文件会使映射失效，写出与
+    之后读取 y 时进程都会崩溃。
+
+    @param file_name 目标文件路径
+    @type str
+    @param y 要写出的采样值
+    @type numpy.ndarray
+    @exception ValueError 目标是 y 映射的文件
+    """
+    source = backing_file(y)
+    if (source is not None and os.path.exists(file_name)
+            and os.path.samefile(source, file_name)):
+        raise ValueError(f"不能覆盖正在使用的数据文件：{file_name}，"
+                         "请选择其他文件名。")
+
+
+@contextmanager
+def replacing(file_name):
+    """
+    先写入同一目录下的临时文件，成功后再替换目标文件。出错或取消时只删除
+    临时文件，目标文件原有的内容不受影响。
+
+        with replacing(file_name) as temp_name:
+            with open(temp_name, "wb") as file:
+                ...
+
+    @param file_name 目标文件路径
+    @type str
+    @return 临时文件路径
+    @rtype str
+    """
+    directory, base = os.path.split(os.path.abspath(file_name))
+    # 以 0666 新建临时文件，由内核按 umask 决定权限，与直接新建目标文件相同。
+    while True:
+        temp_name = os.path.join(directory,
+                                 f".{base}.{os.urandom(4).hex()}.tmp")
+        try:
+            fd = os.open(temp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                         0o666)
+        except FileExistsError:
+            continue
+        break
+    os.close(fd)
+    try:
+        yield temp_name
+        if os.path.exists(file_name):
+            os.chmod(temp_name, os.stat(file_name).st_mode & 0o7777)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def write_header(file, N, f_s, t0=0.0, v_range=(0.0, 0.0), dtype="<f8"):
+    """
+    向已打开的二进制文件写入文件头。
+
+    @param file 以 "wb" 打开的文件对象
+    @type io.BufferedWriter
+    @param N 采样点数
+    @type int
+    @param f_s 采样频率（Hz）
+    @type float
+    @param t0 起始时间（s）
+    @type float
+    @param v_range 输入电压范围 (下限, 上限)
+    @type tuple of float
+    @param dtype 采样数据类型
+    @type str or numpy.dtype
+    """
+    dtype = np.dtype(dtype).newbyteorder("<")
+    header = _HEADER.pack(MAGIC, VERSION, HEADER_SIZE,
+                          dtype.str.encode("ascii"), int(N), float(f_s),
+                          float(t0), float(v_range[0]), float(v_range[1]))
+    file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+
+def write_sample_file(file_name, y, f_s, t0=0.0, v_range=(0.0, 0.0),
+                      progress=None, chunk=WRITE_CHUNK):
+    """
+    将采样数据写入二进制采样文件，数据块分块写出。先写入临时文件，完整写出
+    后才替换目标文件；目标不能是 y 映射的文件。
+
+    @param file_name 文件路径
+    @type str
+    @param y 采样值
+    @type numpy.ndarray
+    @param f_s 采样频率（Hz）
+    @type float
+    @param t0 起始时间（s）
+    @type float
+    @param v_range 输入电压范围 (下限, 上限)
+    @type tuple of float
+    @param progress 每写完一块后的回调，参数为 (已写点数, N)
+    @type callable
+    @param chunk 每块的点数
+    @type int
+    @exception ValueError 目标是 y 映射的文件
+    """
+    check_destination(file_name, y)
+    y = np.asarray(y)
+    dtype = y.dtype.newbyteorder("<")
+    with replacing(file_name) as temp_name:
+        with open(temp_name, "wb") as file:
+            write_header(file, y.size, f_s, t0, v_range, dtype)
+            write_raw(file, y, progress, chunk)
+
+
+def write_raw(file, y, progress=None, chunk=WRITE_CHUNK):
+    """
+    将采样值按小端字节序分块写入已打开的二进制文件，不写文件头。
+
+    @param file 以二进制模式打开、可写的文件对象
+    @type io.RawIOBase
+    @param y 采样值
+    @type numpy.ndarray
+    @param progress 每写完一块后的回调，参数为 (已写点数, N)
+    @type callable
+    @param chunk 每块的点数
+    @type int
+    """
+    dtype = y.dtype.newbyteorder("<")
+    for start in range(0, y.size, chunk):
+        # 通过缓冲区协议写出，也适用于 zip 归档中的成员等非真实文件。
+        file.write(np.ascontiguousarray(y[start:start + chunk], dtype))
+        if progress:
+            progress(min(start + chunk, y.size), y.size)
+
+
+def read_header(file_name):
+    """
+    读取并校验文件头。
+
+    @param file_name 文件路径
+    @type str
+    @return 文件头信息
+    @rtype SampleHeader
+    @exception SampleFileError 文件头不合法
+    """
+    with open(file_name, "rb") as file:
+        raw = file.read(HEADER_SIZE)
+    if len(raw) < _HEADER.size or raw[:len(MAGIC)] != MAGIC:
+        raise SampleFileError("不是 MCS 采样文件。")
+    (_, version, header_size, dtype, N, f_s, t0,
+     v_min, v_max) = _HEADER.unpack_from(raw)
+    if version > VERSION:
+        raise SampleFileError(f"不支持的文件版本：{version}。")
+    if header_size != HEADER_SIZE:
+        raise SampleFileError(f"文件头长度错误：{header_size}。")
+    dtype = dtype.rstrip(b"\0").decode("ascii", "replace")
+    if dtype not in DTYPES:
+        raise SampleFileError(f"不支持的数据类型：{dtype}。")
+    return SampleHeader(version, np.dtype(dtype), N, f_s, t0, v_min, v_max)
+
+
+def read_sample_file(file_name):
+    """
+    以内存映射方式打开二进制采样文件，数据不会被一次性读入内存。
+
+    @param file_name 文件路径
+    @type str
+    @return 文件头信息与只读的采样值数组
+    @rtype tuple of (SampleHeader, numpy.memmap)
+    @exception SampleFileError 文件头不合法或数据块长度与 N 不符
+    """
+    header = read_header(file_name)
+    with open(file_name, "rb") as file:
+        file.seek(0, 2)
+        size = file.tell()
+    expected = HEADER_SIZE + header.N * header.dtype.itemsize
+    if size < expected:
+        raise SampleFileError(f"数据不完整：文件头记录 {header.N} 个采样点，"
+                              f"但文件只有 {size} 字节。")
+    if header.N == 0:
+        return header, np.empty(0, dtype=header.dtype)
+    y = np.memmap(file_name, dtype=header.dtype, mode="r",
+                  offset=HEADER_SIZE, shape=(header.N,))
+    return header, y
+
+
+def read_text_file(file_name, chunk_rows=TEXT_CHUNK_ROWS, progress=None,
+                   dtype=np.float64):
+    """
+    分块解析旧的文本数据文件。
+
+    每次只读入 chunk_rows 行，向量化地转换为数值后直接写入预先分配好的数组，
+    峰值内存与文件大小无关。时间轴不保存，只取第一个点的时间作为 t0。读完后
+    用实际行数校验文件头中的 N，并用时间轴间隔校验 f_s。
+
+    @param file_name 文件路径
+    @type str
+    @param chunk_rows 每块读取的行数
+    @type int
+    @param progress 进度回调，参数为 (已读行数, N)
+    @type callable
+    @param dtype 采样值的数据类型
+    @type numpy.dtype
+    @return 采样值、采样点数、采样频率与起始时间
+    @rtype tuple of (numpy.ndarray, int, float, float)
+    @exception SampleFileError 文件头不合法或数据与文件头不符
+    """
+    with open(file_name, "r") as file:
+        try:
+            N = int(file.readline())
+            f_s = float(file.readline())
+        except ValueError:
+            raise SampleFileError("文件头错误：前两行应为 N 与 f_s。")
+        if N < 0 or f_s <= 0:
+            raise SampleFileError(f"文件头错误：N={N}，f_s={f_s}。")
+
+        y = np.empty(N, dtype)
+        # 前两个点的时间。
+        x = []
+        rows = 0
+        while True:
+            lines = [line for line in islice(file, chunk_rows) if line.strip()]
+            if not lines:
+                break
+            text = "".join(lines).replace("np.float64", "")
+            with warnings.catch_warnings():
+                # 遇到无法解析的字符时 numpy 只给出 DeprecationWarning。
+                warnings.simplefilter("error", DeprecationWarning)
+                try:
+                    values = np.fromstring(text.translate(_TEXT_DELETE),
+                                           sep=" ")
+                except (DeprecationWarning, ValueError):
+                    raise SampleFileError(f"第 {rows + 3} 行之后的数据"
+                                          "无法解析。")
+            if values.size != 2 * len(lines):
+                raise SampleFileError(f"第 {rows + 3} 行之后的数据"
+                                      "不是 (x, y) 格式。")
+            if rows + len(lines) > N:
+                raise SampleFileError(f"数据行数超过文件头记录的 N={N}。")
+            values = values.reshape(-1, 2)
+            if len(x) < 2:
+                x.extend(values[:2 - len(x), 0].tolist())
+            y[rows:rows + len(lines)] = values[:, 1]
+            rows += len(lines)
+            if progress:
+                progress(rows, N)
+
+    if rows != N:
+        raise SampleFileError(f"文件头记录 N={N}，实际读取 {rows} 行。")
+    if N > 1 and not np.isclose(x[1] - x[0], 1 / f_s, rtol=1e-6):
+        raise SampleFileError(f"文件头记录 f_s={f_s}，"
+                              f"与时间间隔 {x[1] - x[0]} 不符。")
+    return y, N, f_s, x[0] if x else 0.0
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing the spectrogram (STFT) of sampled data.
+
+与 Welch 平均相同，分段是原数组的滑动窗口视图，不复制数据；每批最多
+spectrum.WELCH_BATCH_POINTS 个点加窗，并沿 axis=1 做一次 rfft。不同的是
+各分段的功率不全部平均，而是按时间合并到图像的各列：每列为落在该列内的
+分段的平均功率，频率方向再按最大值合并为不超过 MAX_ROWS 行，图像的大小
+与绘图区的像素数相当，与记录长度无关。
+
+整段记录的概览在后台线程中计算一次；放大到不超过 REFINE_POINTS 个采样点
+的范围时，只对可见范围重新计算，时间分辨率提高到每列一个分段。
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import spectrum
+
+# 概览图像的列数与图像的最大行数，约为绘图区的像素数。
+OVERVIEW_COLUMNS = 1024
+MAX_ROWS = 512
+
+# 可见范围的采样点数不超过该值时，只对可见范围重新计算。重新计算约
+# 0.15 s，在后台线程 SpectrogramThread 中进行。
+REFINE_POINTS = 1 << 21
+
+# 图像的幅值（V，频率 × 时间）与 imshow 的 extent (左, 右, 下, 上)。
+SpectrogramImage = namedtuple("SpectrogramImage", ["amplitude", "extent"])
+
+
+def spectrogram(y, f_s, nperseg=4096, overlap=0.5, window="hann",
+                columns=OVERVIEW_COLUMNS, rows=MAX_ROWS, t0=0.0):
+    """
+    计算 y 的时频图，幅值标定与 spectrum.welch_spectrum 相同。
+
+    @param y 采样值，可以是内存映射数组
+    @type numpy.ndarray
+    @param f_s 采样频率（Hz）
+    @type float
+    @param nperseg 分段长度，超过数据长度时取数据长度
+    @type int
+    @param overlap 相邻分段的重叠比例，0~1
+    @type float
+    @param window 窗函数名称
+    @type str
+    @param columns 图像的最大列数
+    @type int
+    @param rows 图像的最大行数
+    @type int
+    @param t0 y 第一个点的时间（s）
+    @type float
+    @return 图像与坐标范围
+    @rtype SpectrogramImage
+    """
+    from scipy.fft import rfft
+
+    nperseg = max(1, min(int(nperseg), len(y)))
+    step = max(1, int(round(nperseg * (1 - overlap))))
+    segments = sliding_window_view(y, nperseg)[::step]
+    count = len(segments)
+    columns = max(1, min(int(columns), count))
+    dtype = spectrum.float_type(y)
+    win = spectrum.window_array(window, nperseg, dtype)
+    batch = max(1, spectrum.WELCH_BATCH_POINTS // nperseg)
+
+    # 第 k 个分段属于第 k * columns // count 列。
+    power = np.zeros((columns, nperseg // 2 + 1))
+    for start in range(0, count, batch):
+        chunk = segments[start:start + batch]
+        chunk = (chunk - chunk.mean(axis=1, keepdims=True)) * win
+        chunk = np.abs(rfft(chunk, axis=1, workers=spectrum.WORKERS))
+        chunk *= chunk
+        column = np.arange(start, start + len(chunk)) * columns // count
+        edges = np.flatnonzero(np.diff(column)) + 1
+        edges = np.concatenate(([0], edges))
+        power[column[edges]] += np.add.reduceat(chunk, edges, axis=0)
+    counts = np.bincount(np.arange(count) * columns // count,
+                         minlength=columns)
+    amplitude = np.sqrt(power / counts[:, None]) / win.sum(dtype=np.float64)
+
+    # 频率方向每 group 个频点取最大值，窄的谱线不会被抹掉。
+    bins = amplitude.shape[1]
+    group = -(-bins // max(int(rows), 1))
+    if group > 1:
+        padded = np.zeros((columns, -(-bins // group) * group))
+        padded[:, :bins] = amplitude
+        amplitude = padded.reshape(columns, -1, group).max(axis=2)
+
+    df = f_s / nperseg
+    extent = (t0, t0 + ((count - 1) * step + nperseg) / f_s,
+              -df / 2, (amplitude.shape[1] * group - 0.5) * df)
+    return SpectrogramImage(amplitude.T.astype(dtype, copy=False), extent)
+
+
+class Spectrogram(object):
+    """
+    一次采集的时频图：整段记录的概览，以及放大后对可见范围的重新计算。
+    """
+    def __init__(self, y, f_s, t0=0.0, nperseg=4096, overlap=0.5,
+                 window="hann"):
+        """
+        Constructor
+
+        @param y 采样值
+        @type numpy.ndarray
+        @param f_s 采样频率（Hz）
+        @type float
+        @param t0 第一个采样点的时间（s）
+        @type float
+        @param nperseg 分段长度
+        @type int
+        @param overlap 相邻分段的重叠比例
+        @type float
+        @param window 窗函数名称
+        @type str
+        """
+        self.y = y
+        self.f_s = f_s
+        self.t0 = t0
+        self.nperseg = nperseg
+        self.overlap = overlap
+        self.window = window
+        self.overview = spectrogram(y, f_s, nperseg, overlap, window,
+                                    t0=t0)
+
+    def view(self, tmin, tmax, width):
+        """
+        返回可见时间范围 [tmin, tmax] 的图像。范围内的点数超过
+        REFINE_POINTS 时返回概览。
+
+        @param tmin 可见范围下限（s）
+        @type float
+        @param tmax 可见范围上限（s）
+        @type float
+        @param width 绘图区宽度（像素），即图像的最大列数
+        @type int
+        @return 图像与坐标范围
+        @rtype SpectrogramImage
+        """
+        N = len(self.y)
+        # 两端各多取一个分段，拖动时边缘不会立即出现空白。
+        start = int(np.floor((tmin - self.t0) * self.f_s)) - self.nperseg
+        stop = int(np.ceil((tmax - self.t0) * self.f_s)) + self.nperseg
+        start, stop = min(max(start, 0), N), min(max(stop, 0), N)
+        if stop - start > REFINE_POINTS or stop - start < self.nperseg \
+                or (start == 0 and stop == N):
+            return self.overview
+        return spectrogram(self.y[start:stop], self.f_s, self.nperseg,
+                           self.overlap, self.window, width,
+                           t0=self.t0 + start / self.f_s)
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing the spectrum of sampled data.
+
+两种频谱计算方式：
+
+* 单次 FFT：对整段数据做一次实数 FFT（rfft），只计算非负频率。
+* Welch 平均：把数据分成相互重叠、加窗的分段，对各段的功率谱取平均。
+  分段按批次计算，内存占用只与分段长度和批次大小有关，与记录长度无关。
+
+两种方式的幅值标定相同（与 |X| / N 一致），可以直接比较。
+
+FFT 使用 scipy.fft 的多线程实现。频率轴与窗函数按参数缓存，相同设置的重复
+采集不必重新生成。频率轴与记录等长，缓存按字节数限制：跟随缩放的 FFT 每次
+的变换长度都不同，只按条目数限制时会积累多个记录长度的数组。
+
+float32 的采样数据按单精度计算（rfft 得到 complex64），频谱为 float32；其他
+类型按双精度计算。
+
+导入 SciPy 需要较长时间，为了让主窗口尽快显示，SciPy 在函数中第一次用到时
+才导入。
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+SINGLE = "single"
+WELCH = "welch"
+
+# Welch 平均每批计算的最大点数（分段数 × 分段长度）。
+WELCH_BATCH_POINTS = 1 << 22
+
+# scipy.fft 使用的线程数，-1 表示使用全部 CPU 核心。
+WORKERS = -1
+
+# 频率轴缓存的字节数上限，可以容纳 400 kHz、100 s 整段记录的频率轴；超过
+# 上限的频率轴不缓存。
+FREQUENCY_CACHE_BYTES = 1 << 28
+
+_frequency_cache = OrderedDict()
+_frequency_bytes = 0
+_frequency_lock = threading.Lock()
+
+
+class SpectrumSettings(object):
+    """频谱计算方式、Welch 参数与频率的测量方式。"""
+    def __init__(self, mode=SINGLE, nperseg=4096, overlap=0.5,
+                 window="hann", fast_len=False, peak_frequency=False):
+        """
+        Constructor
+
+        @param mode 计算方式，SINGLE 或 WELCH
+        @type str
+        @param nperseg Welch 分段长度
+        @type int
+        @param overlap Welch 相邻分段的重叠比例，0~1
+        @type float
+        @param window Welch 窗函数名称，见 scipy.signal.get_window
+        @type str
+        @param fast_len 单次 FFT 是否补零到 next_fast_len 给出的长度
+        @type bool
+        @param peak_frequency 是否由频谱峰值估计频率，否则由过零次数估计
+        @type bool
+        """
+        self.mode = mode
+        self.nperseg = nperseg
+        self.overlap = overlap
+        self.window = window
+        self.fast_len = fast_len
+        self.peak_frequency = peak_frequency
+
+    @property
+    def spectrum_window(self):
+        """计算频谱时使用的窗函数，单次 FFT 为矩形窗。"""
+        return self.window if self.mode == WELCH else "boxcar"
+
+
+def frequencies(n, f_s):
+    """
+    返回 n 点实数 FFT 的频率轴。结果被缓存共享，因此是只读的。缓存按最近
+    最少使用淘汰，总字节数不超过 FREQUENCY_CACHE_BYTES。
+
+    @param n 变换长度
+    @type int
+    @param f_s 采样频率（Hz）
+    @type float
+    @return 频率（Hz）
+    @rtype numpy.ndarray
+    """
+    global _frequency_bytes
+
+    key = (n, f_s)
+    with _frequency_lock:
+        xf = _frequency_cache.get(key)
+        if xf is not None:
+            _frequency_cache.move_to_end(key)
+            return xf
+
+    from scipy.fft import rfftfreq
+
+    xf = rfftfreq(n, 1.0 / f_s)
+    xf.setflags(write=False)
+    if xf.nbytes <= FREQUENCY_CACHE_BYTES:
+        with _frequency_lock:
+            if key not in _frequency_cache:
+                _frequency_cache[key] = xf
+                _frequency_bytes += xf.nbytes
+            while _frequency_bytes > FREQUENCY_CACHE_BYTES:
+                _, old = _frequency_cache.popitem(last=False)
+                _frequency_bytes -= old.nbytes
+    return xf
+
+
+def clear_frequencies():
+    """清空频率轴缓存。"""
+    global _frequency_bytes
+
+    with _frequency_lock:
+        _frequency_cache.clear()
+        _frequency_bytes = 0
+
+
+def float_type(y):
+    """
+    返回采样数据计算时使用的浮点类型：float32 保持不变，其他为 float64。
+
+    @param y 采样值
+    @type numpy.ndarray
+    @return 浮点类型
+    @rtype numpy.dtype
+    """
+    return np.result_type(y.dtype, np.float32)
+
+
+@lru_cache(maxsize=16)
+def window_array(window, n, dtype=np.float64):
+    """
+    返回 n 点窗函数。结果被缓存共享，因此是只读的。
+
+    @param window 窗函数名称
+    @type str
+    @param n 窗长度
+    @type int
+    @param dtype 数据类型
+    @type numpy.dtype
+    @return 窗函数
+    @rtype numpy.ndarray
+    """
+    from scipy.signal import get_window
+
+    win = get_window(window, n).astype(dtype, copy=False)
+    win.setflags(write=False)
+    return win
+
+
+def fft_spectrum(y, f_s, fast_len=False):
+    """
+    用单次实数 FFT 计算采样数据的单边幅度谱。
+
+    N 含有较大的质因数时变换很慢；fast_len 为 True 时补零到 next_fast_len
+    给出的长度，频率分辨率略有变化，幅值仍按原点数 N 标定。
+
+    @param y 采样值
+    @type numpy.ndarray
+    @param f_s 采样频率（Hz）
+    @type float
+    @param fast_len 是否补零到快速变换长度
+    @type bool
+    @return 频率与对应的幅值
+    @rtype tuple of (numpy.ndarray, numpy.ndarray)
+    """
+    from scipy.fft import rfft, next_fast_len
+
+    N = len(y)
+    n = next_fast_len(N, real=True) if fast_len and N else N
+    yf = np.abs(rfft(y, n, workers=WORKERS))
+    yf /= N
+    return frequencies(n, f_s), yf
+
+
+def welch_spectrum(y, f_s, nperseg=4096, overlap=0.5, window="hann"):
+    """
+    用 Welch 方法计算平均后的单边幅度谱。
+
+    各分段是原数组的视图，不复制数据；每批最多 WELCH_BATCH_POINTS 个点加窗
+    并变换，累加功率后即释放。
+
+    @param y 采样值，可以是内存映射数组
+    @type numpy.ndarray
+    @param f_s 采样频率（Hz）
+    @type float
+    @param nperseg 分段长度，超过数据长度时取数据长度
+    @type int
+    @param overlap 相邻分段的重叠比例，0~1
+    @type float
+    @param window 窗函数名称
+    @type str
+    @return 频率与对应的幅值
+    @rtype tuple of (numpy.ndarray, numpy.ndarray)
+    """
+    from scipy.fft import rfft
+
+    nperseg = max(1, min(int(nperseg), len(y)))
+    step = max(1, int(round(nperseg * (1 - overlap))))
+    segments = sliding_window_view(y, nperseg)[::step]
+    dtype = float_type(y)
+    win = window_array(window, nperseg, dtype)
+    batch = max(1, WELCH_BATCH_POINTS // nperseg)
+
+    power = np.zeros(nperseg // 2 + 1)
+    for start in range(0, len(segments), batch):
+        chunk = segments[start:start + batch]
+        # 去掉每段的均值再加窗，与 scipy.signal.welch 的 detrend 一致。
+        chunk = (chunk - chunk.mean(axis=1, keepdims=True)) * win
+        spectrum = np.abs(rfft(chunk, axis=1, workers=WORKERS))
+        power += np.einsum("ij,ij->j", spectrum, spectrum)
+
+    # 功率总是按 float64 累加。幅值按窗函数的相干增益换算，正弦分量的峰值
+    # 与单次 FFT 相同。
+    yf = np.sqrt(power / len(segments)) / win.sum(dtype=np.float64)
+    return frequencies(nperseg, f_s), yf.astype(dtype, copy=False)
+
+
+def compute_spectrum(y, f_s, settings=None):
+    """
+    按设置计算频谱。
+
+    @param y 采样值
+    @type numpy.ndarray
+    @param f_s 采样频率（Hz）
+    @type float
+    @param settings 频谱设置，默认为单次 FFT
+    @type SpectrumSettings
+    @return 频率与对应的幅值
+    @rtype tuple of (numpy.ndarray, numpy.ndarray)
+    """
+    if settings is not None and settings.mode == WELCH:
+        return welch_spectrum(y, f_s, settings.nperseg, settings.overlap,
+                              settings.window)
+    return fft_spectrum(y, f_s, settings is not None and settings.fast_len)
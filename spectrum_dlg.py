@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing SpectrumDialog.
+"""
+
+from PyQt5.QtCore import pyqtSlot, Qt
+from PyQt5.QtWidgets import QDialog
+
+from Ui_spectrum import Ui_Dialog
+import spectrum
+
+
+class SpectrumDialog(QDialog, Ui_Dialog):
+    """
+    频谱设置对话框，选择单次 FFT 或 Welch 平均及其参数，以及频率的测量方式。
+    """
+    def __init__(self, parent=None):
+        """
+        Constructor
+        
+        @param parent reference to the parent widget
+        @type QWidget
+        """
+        super(SpectrumDialog, self).__init__(parent)
+        self.setupUi(self)
+        self.setWindowFlags(Qt.CustomizeWindowHint | Qt.WindowCloseButtonHint)
+        
+        self.mode = spectrum.SINGLE
+        self.nperseg = int(self.comboBox.currentText())
+        self.overlap = self.spinBox.value() / 100
+        self.window = self.comboBox_2.currentText()
+        self.fast_len = self.checkBox.isChecked()
+        self.peak_frequency = self.checkBox_2.isChecked()
+    
+    def settings(self):
+        """
+        返回当前的频谱设置。
+        
+        @return 频谱设置
+        @rtype spectrum.SpectrumSettings
+        """
+        return spectrum.SpectrumSettings(self.mode, self.nperseg,
+                                         self.overlap, self.window,
+                                         self.fast_len, self.peak_frequency)
+    
+    @pyqtSlot(bool)
+    def on_radioButton_toggled(self, checked):
+        """
+        使用单次 FFT
+        
+        @param checked DESCRIPTION
+        @type self, bool
+        """
+        if checked:
+            self.mode = spectrum.SINGLE
+    
+    @pyqtSlot(bool)
+    def on_checkBox_toggled(self, checked):
+        """
+        单次 FFT 是否补零到快速变换长度
+        
+        @param checked DESCRIPTION
+        @type self, bool
+        """
+        self.fast_len = checked
+    
+    @pyqtSlot(bool)
+    def on_checkBox_2_toggled(self, checked):
+        """
+        是否由频谱峰值估计频率
+        
+        @param checked DESCRIPTION
+        @type self, bool
+        """
+        self.peak_frequency = checked
+    
+    @pyqtSlot(bool)
+    def on_radioButton_2_toggled(self, checked):
+        """
+        使用 Welch 平均
+        
+        @param checked DESCRIPTION
+        @type self, bool
+        """
+        if checked:
+            self.mode = spectrum.WELCH
+    
+    @pyqtSlot(str)
+    def on_comboBox_currentTextChanged(self, text):
+        """
+        设置 Welch 分段长度
+        
+        @param text DESCRIPTION
+        @type str
+        """
+        self.nperseg = int(text)
+    
+    @pyqtSlot(int)
+    def on_spinBox_valueChanged(self, value):
+        """
+        设置 Welch 分段重叠比例
+        
+        @param value DESCRIPTION
+        @type int
+        """
+        self.overlap = value / 100
+    
+    @pyqtSlot(str)
+    def on_comboBox_2_currentTextChanged(self, text):
+        """
+        设置 Welch 窗函数
+        
+        @param text DESCRIPTION
+        @type str
+        """
+        self.window = text
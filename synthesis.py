@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing waveform synthesis.
+
+除噪声外，采样信号完全由波形、信号频率、采样频率与点数决定。单位幅值的波形
+及其实数 FFT 按这些参数缓存在 WaveformCache 中（受字节数上限约束，按最近最少
+使用淘汰），重复采集或只切换输入电压范围时不必重新计算三角函数。超过
+DIRECT_POINTS 个点的长记录若可以平铺，则不经过缓存，直接在时域中生成。
+
+白噪声在频域中直接生成：实数 FFT 是正交变换，独立同分布的高斯噪声变换后各
+频点仍是独立的高斯变量。于是采样信号的频谱等于缓存的波形频谱乘以幅值、加上
+直流分量与噪声频谱，时域信号由一次 irfft 得到，界面显示的频谱无需再做 FFT。
+
+方波、三角波与正弦波都是周期信号。当 p 个采样点恰好（或在 PHASE_TOLERANCE
+以内）包含整数个信号周期时，只计算这 p 个点，再以整块复制的方式铺满输出，
+不必对全部 T * f_s 个点求三角函数；否则退回直接计算。
+"""
+
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+
+import numpy as np
+
+import spectrum
+
+# 波形类型，与菜单 View-Signal 中的选项对应。
+SQUARE = 1
+TRIANGLE = 2
+SINE = 3
+
+# 噪声的标准差（V）。
+NOISE_STD = 1 / 50
+
+# 波形缓存的字节数上限。
+CACHE_BYTES = 1 << 30
+
+# 超过该点数且可以平铺时直接在时域中生成，不经过波形缓存。
+DIRECT_POINTS = 1 << 22
+
+# 平铺时一个周期块的最大点数，以及整段数据上允许累积的最大相位误差（rad）。
+MAX_TILE = 1 << 20
+PHASE_TOLERANCE = 1e-6
+
+
+def unit_waveform(wave, freq, sample_point):
+    """
+    生成幅值为 1、不含噪声与直流偏置的波形。
+
+    @param wave 波形类型
+    @type int
+    @param freq 信号频率（Hz）
+    @type float
+    @param sample_point 采样时间点（s）
+    @type numpy.ndarray
+    @return 波形
+    @rtype numpy.ndarray
+    """
+    # SciPy 在第一次用到时才导入，见 spectrum 模块。
+    from scipy import signal
+
+    # 函数的相位
+    phase = 2 * np.pi * freq * sample_point
+
+    if wave == SINE:
+        # 正弦波
+        return np.sin(phase)
+    elif wave == TRIANGLE:
+        # 三角波
+        return signal.sawtooth(phase, 0.5)
+    else:
+        # 方波
+        return signal.square(phase)
+
+
+def find_tile(freq, f_s, N):
+    """
+    寻找可以平铺的周期块长度。
+
+    取 p 个采样点包含 q 个信号周期，p / q 为 f_s / freq 的有理逼近；平铺产生的
+    相位误差在 N 个点上累积为 2π N |freq / f_s - q / p|，不超过 PHASE_TOLERANCE
+    时可以平铺。
+
+    @param freq 信号频率（Hz）
+    @type float
+    @param f_s 采样频率（Hz）
+    @type float
+    @param N 采样点数
+    @type int
+    @return 周期块的点数 p，不能平铺或平铺没有收益时返回 None
+    @rtype int
+    """
+    if freq <= 0 or f_s <= 0:
+        return None
+    ratio = Fraction(freq) / Fraction(f_s)
+    # 至少要能铺两块才有收益。
+    limit = min(MAX_TILE, N // 2)
+    if limit < 1:
+        return None
+    approx = ratio.limit_denominator(limit)
+    if approx.numerator == 0:
+        return None
+    p = approx.denominator
+    drift = 2 * np.pi * N * abs(float(ratio - approx))
+    return p if drift <= PHASE_TOLERANCE else None
+
+
+def tile_into(out, tile, add=False):
+    """
+    把周期块重复铺满 out。add 为 True 时累加到 out 上，不产生整段的临时数组。
+
+    @param out 输出数组
+    @type numpy.ndarray
+    @param tile 周期块
+    @type numpy.ndarray
+    @param add 是否累加
+    @type bool
+    """
+    p = len(tile)
+    m = len(out) // p
+    # 整块部分视为 m 行 p 列，借助广播一次完成复制。
+    body = out[:m * p].reshape(m, p)
+    rest = out[m * p:]
+    if add:
+        body += tile
+        rest += tile[:len(rest)]
+    else:
+        body[...] = tile
+        rest[...] = tile[:len(rest)]
+
+
+def periodic_waveform(wave, freq, f_s, N, start=0, out=None, add=False,
+                      dtype=np.float64):
+    """
+    生成第 start ~ start + N - 1 个采样点上的单位幅值波形，能平铺时只计算
+    一个周期块。
+
+    @param wave 波形类型
+    @type int
+    @param freq 信号频率（Hz）
+    @type float
+    @param f_s 采样频率（Hz）
+    @type float
+    @param N 点数
+    @type int
+    @param start 第一个点的采样序号
+    @type int
+    @param out 输出数组，默认新建
+    @type numpy.ndarray
+    @param add 是否累加到 out 上
+    @type bool
+    @param dtype 新建输出数组时的数据类型
+    @type numpy.dtype
+    @return 波形
+    @rtype numpy.ndarray
+    """
+    if out is None:
+        out = np.zeros(N, dtype) if add else np.empty(N, dtype)
+    p = find_tile(freq, f_s, N)
+    if p is None:
+        shape = unit_waveform(wave, freq, np.arange(start, start + N) / f_s)
+    else:
+        shape = unit_waveform(wave, freq, np.arange(start, start + p) / f_s)
+        tile_into(out, shape, add)
+        return out
+    if add:
+        out += shape
+    else:
+        out[...] = shape
+    return out
+
+
+def generate_block(wave, freq, amplitude, f_s, N, start=0, noise=NOISE_STD,
+                   rng=None, out=None, dtype=np.float64):
+    """
+    生成含噪声的一段采样数据。噪声直接生成在输出数组中；能平铺时波形按周期块
+    累加到输出数组上，不产生整段的临时数组。
+
+    @param wave 波形类型
+    @type int
+    @param freq 信号频率（Hz）
+    @type float
+    @param amplitude 幅值与直流偏置 (幅值, 偏置)
+    @type tuple of float
+    @param f_s 采样频率（Hz）
+    @type float
+    @param N 点数
+    @type int
+    @param start 第一个点的采样序号
+    @type int
+    @param noise 噪声的标准差（V）
+    @type float
+    @param rng 随机数生成器，默认新建
+    @type numpy.random.Generator
+    @param out 预先分配的输出数组，默认新建
+    @type numpy.ndarray
+    @param dtype 新建输出数组时的数据类型，float64 或 float32
+    @type numpy.dtype
+    @return 采样值
+    @rtype numpy.ndarray
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if out is None:
+        out = np.empty(N, dtype)
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= noise
+    # 相位总是在 float64 中计算，累加到 out 时才转换为 out 的精度。
+    p = find_tile(freq, f_s, N)
+    if p is None:
+        out += amplitude[0] * unit_waveform(
+            wave, freq, np.arange(start, start + N) / f_s)
+    else:
+        tile = unit_waveform(wave, freq, np.arange(start, start + p) / f_s)
+        tile *= amplitude[0]
+        tile_into(out, tile, add=True)
+    out += amplitude[1]
+    return out
+
+
+class CachedWaveform(object):
+    """
+    缓存的单位幅值波形与波形的实数 FFT，均为只读数组，精度与采样值相同。
+    """
+    def __init__(self, shape, spectrum):
+        self.shape = shape
+        self.spectrum = spectrum
+        for array in (shape, spectrum):
+            array.setflags(write=False)
+        self.nbytes = shape.nbytes + spectrum.nbytes
+
+
+class WaveformCache(object):
+    """
+    按 (波形, 信号频率, 采样频率, 点数, 精度) 缓存单位幅值波形的 LRU 缓存。
+
+    缓存总字节数不超过 max_bytes；单个条目超过上限时不缓存。可以在多个
+    后台线程中同时使用。
+    """
+    def __init__(self, max_bytes=CACHE_BYTES):
+        """
+        Constructor
+
+        @param max_bytes 缓存的字节数上限
+        @type int
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fits(self, N, dtype=np.float64):
+        """N 点、精度为 dtype 的条目能否放入缓存。"""
+        # 波形 N 个 dtype，频谱 N/2+1 个对应的复数。
+        itemsize = np.dtype(dtype).itemsize
+        return itemsize * N + 2 * itemsize * (N // 2 + 1) <= self.max_bytes
+
+    def get(self, wave, freq, f_s, N, dtype=np.float64):
+        """
+        取得缓存的波形，不存在时计算并放入缓存。
+
+        @param wave 波形类型
+        @type int
+        @param freq 信号频率（Hz）
+        @type float
+        @param f_s 采样频率（Hz）
+        @type float
+        @param N 采样点数
+        @type int
+        @param dtype 波形的数据类型
+        @type numpy.dtype
+        @return 缓存的波形
+        @rtype CachedWaveform
+        """
+        key = (wave, freq, f_s, N, np.dtype(dtype).str)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        from scipy.fft import rfft
+
+        shape = periodic_waveform(wave, freq, f_s, N, dtype=dtype)
+        entry = CachedWaveform(shape, rfft(shape))
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = entry
+                self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes and self.entries:
+                _, old = self.entries.popitem(last=False)
+                self.nbytes -= old.nbytes
+        return entry
+
+    def clear(self):
+        """清空缓存。"""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+
+cache = WaveformCache()
+
+
+def noise_spectrum(rng, N, std, dtype=np.float64):
+    """
+    生成 N 点白噪声的实数 FFT：与对时域中标准差为 std 的独立高斯噪声做 rfft
+    得到的结果同分布。
+
+    @param rng 随机数生成器
+    @type numpy.random.Generator
+    @param N 时域点数
+    @type int
+    @param std 时域噪声的标准差
+    @type float
+    @param dtype 时域信号的数据类型，频谱为对应精度的复数
+    @type numpy.dtype
+    @return 噪声频谱
+    @rtype numpy.ndarray
+    """
+    n = N // 2 + 1
+    scale = std * np.sqrt(N / 2)
+    Z = np.empty(n, dtype=np.result_type(dtype, np.complex64))
+    Z.real = rng.standard_normal(n, dtype=Z.real.dtype)
+    Z.imag = rng.standard_normal(n, dtype=Z.real.dtype)
+    Z *= scale
+    # 直流分量与（N 为偶数时的）奈奎斯特频点是实数，方差为 N * std ** 2。
+    Z[0] = Z[0].real * np.sqrt(2)
+    if N % 2 == 0:
+        Z[-1] = Z[-1].real * np.sqrt(2)
+    return Z
+
+
+def synthesize(wave, freq, amplitude, f_s, T, noise=NOISE_STD,
+               waveform_cache=cache, dtype=np.float64):
+    """
+    生成一次采集的采样数据。
+
+    点数不超过 DIRECT_POINTS 且缓存可以容纳时，时域信号与单边幅度谱都由缓存
+    的波形频谱和新生成的噪声频谱得到；否则直接在时域中平铺生成，频谱返回
+    None，交由 spectrum 模块计算。点数很大时平铺加一次 FFT 比 irfft 加缓存
+    条目更快，也不必占用与记录同长的缓存。
+
+    dtype 为 float32 时采样值与频谱分别为 float32 与 complex64 计算的结果，
+    内存约为 float64 的一半。第 k 个采样点的时间为 k / f_s，不生成时间轴。
+
+    @param wave 波形类型
+    @type int
+    @param freq 信号频率（Hz）
+    @type float
+    @param amplitude 幅值与直流偏置 (幅值, 偏置)
+    @type tuple of float
+    @param f_s 采样频率（Hz）
+    @type float
+    @param T 采样时间（s）
+    @type float
+    @param noise 噪声的标准差（V）
+    @type float
+    @param waveform_cache 波形缓存
+    @type WaveformCache
+    @param dtype 采样值的数据类型，float64 或 float32
+    @type numpy.dtype
+    @return 采样值，以及频率与幅值（或 None）
+    @rtype tuple of (numpy.ndarray, tuple or None)
+    """
+    N = int(round(T * f_s))
+    if ((N > DIRECT_POINTS and find_tile(freq, f_s, N) is not None)
+            or not waveform_cache.fits(N, dtype)):
+        y = generate_block(wave, freq, amplitude, f_s, N, noise=noise,
+                           dtype=dtype)
+        return y, None
+
+    from scipy.fft import irfft
+
+    entry = waveform_cache.get(wave, freq, f_s, N, dtype)
+    Y = noise_spectrum(np.random.default_rng(), N, noise, dtype)
+    Y += amplitude[0] * entry.spectrum
+    Y[0] += amplitude[1] * N
+    y = irfft(Y, N)
+    yf = np.abs(Y)
+    yf /= N
+    return y, (spectrum.frequencies(N, f_s), yf)
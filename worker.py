@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module implementing ComputeThread, SpectrumThread, SpectrogramThread and
+ExportThread.
+"""
+
+import importlib
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import analysis
+import export
+import spectrum
+from acquisition import Acquisition
+from decimate import MinMaxPyramid
+from instrument import NULL_TRACE
+from spectrogram import Spectrogram
+
+
+# 主窗口显示后在后台预先导入的模块，第一次计算时不必再等待。
+PRELOAD_MODULES = ["scipy.fft", "scipy.signal"]
+
+
+class Cancelled(Exception):
+    """计算已被取消。"""
+
+
+class AcquisitionResult(object):
+    """一次采集的全部计算结果，由工作线程交给界面。"""
+    def __init__(self, acquisition, xf, yf, features, pyramids,
+                 from_file=False, spectrogram=None, average=None):
+        """
+        Constructor
+
+        @param acquisition 采样数据
+        @type Acquisition
+        @param xf 频谱的频率
+        @type numpy.ndarray
+        @param yf 频谱的幅值
+        @type numpy.ndarray
+        @param features 最大幅值、周期与频率
+        @type tuple of float
+        @param pyramids 采样波形与频谱的抽取金字塔
+        @type tuple of MinMaxPyramid
+        @param from_file 数据是否来自文件
+        @type bool
+        @param spectrogram 时频图，未要求计算时为 None
+        @type Spectrogram
+        @param average 多次平均的统计，未平均时为 None
+        @type averaging.AverageStats
+        """
+        self.acquisition = acquisition
+        self.xf = xf
+        self.yf = yf
+        self.features = features
+        self.pyramids = pyramids
+        self.from_file = from_file
+        self.spectrogram = spectrogram
+        self.average = average
+
+
+class ComputeThread(QThread):
+    """
+    在后台线程中完成采样数据的生成（或读取）、FFT、测量与绘图抽取，需要时
+    还计算时频图的概览。FFT 与测量由 analysis 模块完成。
+
+    给出 averager 时重复调用 source 共 averager.count 次，采样值与幅度谱
+    原地累加到 averager 中，对平均结果做测量与抽取，见 averaging 模块。
+
+    numpy 的运算无法中途打断，取消只在各阶段之间生效；被取消的线程不会
+    发出 resultReady。各阶段的耗时与内存记录在 trace 中，绘图阶段由界面
+    线程补上。
+    """
+    # 进度（0~100）与当前阶段说明
+    progressChanged = pyqtSignal(int, str)
+    resultReady = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, source, from_file=False, settings=None,
+                 trace=NULL_TRACE, spectrogram=False, averager=None,
+                 average_key=None, parent=None):
+        """
+        Constructor
+
+        @param source 返回 Acquisition 的函数，参数为进度回调 (已完成, 总数)
+        @type callable
+        @param from_file 数据是否来自文件
+        @type bool
+        @param settings 频谱设置
+        @type spectrum.SpectrumSettings
+        @param trace 各阶段的记录，见 instrument 模块
+        @type instrument.Trace
+        @param spectrogram 是否计算时频图，分段参数与 Welch 平均相同
+        @type bool
+        @param averager 多次平均的累加器，None 时只采集一次
+        @type averaging.Averager
+        @param average_key 采集参数，参数改变时重新开始平均
+        @type object
+        @param parent reference to the parent object
+        @type QObject
+        """
+        super(ComputeThread, self).__init__(parent)
+        self.source = source
+        self.from_file = from_file
+        self.settings = settings
+        self.trace = trace
+        self.spectrogram = spectrogram
+        self.averager = averager
+        self.average_key = average_key
+        self.cancelled = False
+
+    def cancel(self):
+        """请求取消计算。"""
+        self.cancelled = True
+
+    def check(self, value, text):
+        """阶段之间检查是否已取消，并报告进度。"""
+        if self.cancelled:
+            raise Cancelled()
+        self.progressChanged.emit(value, text)
+
+    def report_load(self, done, total):
+        """读取或生成数据时的进度回调，映射到 0~40。"""
+        self.check(int(40 * done / total) if total else 40, "读取数据")
+
+    def average(self):
+        """
+        重复采集并累加，进度映射到 0~40。
+
+        @return 平均后的采样数据、幅度谱与统计
+        @rtype tuple of (Acquisition, tuple of numpy.ndarray,
+            averaging.AverageStats)
+        """
+        averager = self.averager
+        token = averager.begin(self.average_key)
+        count = averager.count
+        with self.trace.stage("平均") as stage:
+            for k in range(count):
+                self.check(40 * k // count, f"平均 {k + 1}/{count}")
+                acquisition = self.source(None)
+                xf, yf = analysis.acquisition_spectrum(acquisition,
+                                                       self.settings)
+                if not averager.add(token, acquisition.y, xf, yf):
+                    raise Cancelled()
+                stage.samples = acquisition.N * (k + 1)
+        result = averager.result(token)
+        if result is None:
+            raise Cancelled()
+        y, xf, yf, stats = result
+        return (Acquisition(y, acquisition.f_s, acquisition.t0,
+                            acquisition.v_range),
+                (xf, yf), stats)
+
+    def run(self):
+        """依次执行各阶段。"""
+        try:
+            self.check(0, "生成数据")
+            if self.averager is None:
+                with self.trace.stage("读取数据" if self.from_file
+                                      else "生成数据") as stage:
+                    acquisition = self.source(self.report_load)
+                    stage.samples = acquisition.N
+                precomputed = stats = None
+            else:
+                acquisition, precomputed, stats = self.average()
+            result = analysis.analyze(acquisition, self.settings,
+                                      self.check, self.trace, precomputed)
+            xf, yf = result.xf, result.yf
+
+            self.check(80, "绘图")
+            with self.trace.stage("抽取", acquisition.N + len(yf)):
+                # 频率轴同样是等间隔的。
+                df = xf[1] - xf[0] if len(xf) > 1 else 1.0
+                pyramids = (MinMaxPyramid(acquisition.y, acquisition.t0,
+                                          acquisition.dt),
+                            MinMaxPyramid(yf, xf[0] if len(xf) else 0.0, df))
+
+            spectrogram = None
+            if self.spectrogram and acquisition.N:
+                self.check(90, "时频图")
+                settings = self.settings or spectrum.SpectrumSettings()
+                with self.trace.stage("时频图", acquisition.N):
+                    spectrogram = Spectrogram(
+                        acquisition.y, acquisition.f_s, acquisition.t0,
+                        settings.nperseg, settings.overlap, settings.window)
+
+            self.check(100, "完成")
+            self.resultReady.emit(AcquisitionResult(
+                acquisition, xf, yf, result.features, pyramids,
+                self.from_file, spectrogram, stats))
+        except Cancelled:
+            pass
+        except Exception as err:
+            if not self.cancelled:
+                self.failed.emit(str(err))
+
+
+class SpectrumThread(QThread):
+    """
+    在后台线程中计算一段采样数据的频谱与抽取金字塔，用于跟随采样波形
+    缩放的 FFT。采样值取原数组的切片视图，不复制。
+
+    可见范围的点数是任意的，含有大质因数时 rfft 改用 Bluestein 算法，时间
+    与内存都要翻几倍，因此单次 FFT 总是补零到快速变换长度。
+    """
+    resultReady = pyqtSignal(object)
+
+    def __init__(self, acquisition, start, stop, settings=None, parent=None):
+        """
+        Constructor
+
+        @param acquisition 采样数据
+        @type Acquisition
+        @param start 第一个点的序号
+        @type int
+        @param stop 最后一个点的序号加 1
+        @type int
+        @param settings 频谱设置
+        @type spectrum.SpectrumSettings
+        @param parent reference to the parent object
+        @type QObject
+        """
+        super(SpectrumThread, self).__init__(parent)
+        self.acquisition = acquisition
+        self.start_index = start
+        self.stop_index = stop
+        self.settings = settings
+
+    def run(self):
+        """计算频谱并构建抽取金字塔，完成后发出 resultReady。"""
+        y = self.acquisition.y[self.start_index:self.stop_index]
+        settings = self.settings or spectrum.SpectrumSettings()
+        settings = spectrum.SpectrumSettings(
+            settings.mode, settings.nperseg, settings.overlap,
+            settings.window, True, settings.peak_frequency)
+        xf, yf = spectrum.compute_spectrum(y, self.acquisition.f_s, settings)
+        df = xf[1] - xf[0] if len(xf) > 1 else 1.0
+        self.resultReady.emit(MinMaxPyramid(yf, xf[0] if len(xf) else 0.0,
+                                            df))
+
+
+class SpectrogramThread(QThread):
+    """
+    在后台线程中计算时频图：为已有的采集新建时频图，或按可见范围向
+    spectrogram.Spectrogram.view 取图像。key 为发起计算时的采集或时频图，
+    结果到达时据此判断是否已经过时。
+    """
+    resultReady = pyqtSignal(object)
+
+    def __init__(self, function, key, parent=None):
+        """
+        Constructor
+
+        @param function 在后台线程中调用的函数，返回值由 resultReady 发出
+        @type callable
+        @param key 发起计算时的采集或时频图
+        @type object
+        @param parent reference to the parent object
+        @type QObject
+        """
+        super(SpectrogramThread, self).__init__(parent)
+        self.function = function
+        self.key = key
+
+    def run(self):
+        """完成计算后发出 resultReady。"""
+        self.resultReady.emit(self.function())
+
+
+class ExportThread(QThread):
+    """
+    在后台线程中分块导出采样数据，见 export 模块。取消在写完当前一块后
+    生效，未写完的临时文件被删除，已有的同名文件不变，不发出 exported。
+    """
+    # 进度（0~100）与说明
+    progressChanged = pyqtSignal(int, str)
+    exported = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, acquisition, file_name, fmt, trace=NULL_TRACE,
+                 parent=None):
+        """
+        Constructor
+
+        @param acquisition 采样数据
+        @type Acquisition
+        @param file_name 文件路径
+        @type str
+        @param fmt 导出格式，export.FORMATS 中的一个
+        @type str
+        @param trace 导出阶段的记录，见 instrument 模块
+        @type instrument.Trace
+        @param parent reference to the parent object
+        @type QObject
+        """
+        super(ExportThread, self).__init__(parent)
+        self.acquisition = acquisition
+        self.file_name = file_name
+        self.fmt = fmt
+        self.trace = trace
+        self.cancelled = False
+        self.percent = -1
+
+    def cancel(self):
+        """请求取消导出。"""
+        self.cancelled = True
+
+    def report(self, done, total):
+        """每写完一块后检查是否已取消；进度变化时才发出信号。"""
+        if self.cancelled:
+            raise Cancelled()
+        percent = int(100 * done / total) if total else 100
+        if percent != self.percent:
+            self.percent = percent
+            self.progressChanged.emit(percent, "导出数据")
+
+    def run(self):
+        """导出数据。"""
+        try:
+            with self.trace.stage("导出", self.acquisition.N):
+                export.export(self.acquisition, self.file_name, self.fmt,
+                              self.report)
+            self.exported.emit(self.file_name)
+        except Cancelled:
+            pass
+        except Exception as err:
+            self.failed.emit(str(err))
+
+
+class PreloadThread(QThread):
+    """在后台线程中导入 PRELOAD_MODULES。"""
+    def run(self):
+        """依次导入各模块。"""
+        for name in PRELOAD_MODULES:
+            importlib.import_module(name)